@@ -1,33 +1,166 @@
 import logging
+import time
+from pathlib import Path
+from typing import Any
+
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import (
+    Event,
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
 
-from .controller import SaunaController
+from .capture import CaptureWriter
+from .controller import SNAPSHOT_FIELDS, SaunaController, SaunaTransport
+from .discovery import DiscoveredSauna, DiscoveryListener
+from .protocol import CONTROL_PORT
 
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "tylo_sauna"
 PLATFORMS = ["climate", "light", "number", "sensor"]
 
+# hass.data[DOMAIN] key of the UDP socket shared by all entries
+DATA_TRANSPORT = "transport"
+# hass.data[DOMAIN] key of the background discovery listener
+DATA_DISCOVERY = "discovery"
+
+# Last known sauna state, restored at startup until telemetry arrives
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 30  # seconds
+
+
+# In-memory telemetry history (see history.py), served without the recorder
+SERVICE_GET_HISTORY = "get_history"
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional("entry_id"): cv.string,
+        vol.Optional("hours", default=1.0): vol.All(
+            vol.Coerce(float), vol.Range(min=0.01, max=24)
+        ),
+        vol.Optional("points", default=120): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1000)
+        ),
+    }
+)
+
+
+def _store(hass: HomeAssistant, entry: ConfigEntry) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+
+
+def _settings(entry: ConfigEntry) -> dict[str, Any]:
+    """Entry settings; tuning changed in the options flow overrides the setup data."""
+    return {**entry.data, **entry.options}
+
+
+def _get_transport(hass: HomeAssistant) -> SaunaTransport:
+    """Return the domain-wide UDP transport, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    transport = domain_data.get(DATA_TRANSPORT)
+    if transport is None:
+        transport = domain_data[DATA_TRANSPORT] = SaunaTransport()
+    return transport
+
+
+async def async_get_discovery(hass: HomeAssistant) -> DiscoveryListener | None:
+    """Return the running discovery listener, starting it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    listener: DiscoveryListener | None = domain_data.get(DATA_DISCOVERY)
+    if listener is None:
+        listener = domain_data[DATA_DISCOVERY] = DiscoveryListener()
+
+        @callback
+        def _async_stop_discovery(_event: Event) -> None:
+            listener.stop()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop_discovery)
+
+    if not listener.running and not await listener.async_start():
+        _LOGGER.debug("Tylo Sauna discovery: no UDP sockets opened")
+        return None
+    return listener
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """
     Component initialization.
     This integration does not use YAML config; all configuration goes through the config flow.
     """
+
+    async def _async_get_history(call: ServiceCall) -> ServiceResponse:
+        """Downsampled recent telemetry of one or all saunas."""
+        entries = {
+            entry_id: data
+            for entry_id, data in hass.data.get(DOMAIN, {}).items()
+            if entry_id not in (DATA_TRANSPORT, DATA_DISCOVERY)
+        }
+        entry_id = call.data.get("entry_id")
+        if entry_id is not None:
+            if entry_id not in entries:
+                raise ServiceValidationError(f"Unknown Tylo Sauna entry: {entry_id}")
+            entries = {entry_id: entries[entry_id]}
+
+        # Samples carry event loop (monotonic) timestamps
+        end = hass.loop.time()
+        wall_offset = time.time() - end
+        start = end - call.data["hours"] * 3600
+        result = {}
+        for entry_id, data in entries.items():
+            controller: SaunaController = data["controller"]
+            samples = controller.history.window(start, end, call.data["points"])
+            for sample in samples:
+                sample["time"] = dt_util.utc_from_timestamp(
+                    sample.pop("ts") + wall_offset
+                ).isoformat()
+            result[entry_id] = {"name": controller.name, "samples": samples}
+        return result
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        _async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    # Listen for sauna broadcasts in the background, so the config flow can
+    # list saunas right away
+    hass.async_create_task(async_get_discovery(hass))
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up a Tylo Sauna config entry."""
-    host = entry.data["host"]
-    port = entry.data.get("port", 42156)
-    name = entry.data.get("name", "Tylo Sauna")
+    settings = _settings(entry)
+    host = settings["host"]
+    port = settings.get("port", CONTROL_PORT)
+    name = settings.get("name", "Tylo Sauna")
 
-    guid = entry.data.get("guid")
-    relaxed = entry.data.get("relaxed_telemetry", True)
+    guid = settings.get("guid")
+    relaxed = settings.get("relaxed_telemetry", True)
+    flush_window_ms = settings.get("flush_window_ms", 0)
+    profile_fields = settings.get("profile_fields", False)
+    temperature_precision = settings.get("temperature_precision", 0.0)
+    unique_host = settings.get("unique_host", host)
+
+    capture = None
+    if settings.get("capture", False):
+        capture = CaptureWriter(
+            Path(hass.config.path(DOMAIN, f"capture_{unique_host}.bin")),
+            max_bytes=settings.get("capture_max_mb", 64) * 1024 * 1024,
+        )
+        _LOGGER.info("Tylo Sauna: capturing datagrams to %s", capture.path)
 
     controller = SaunaController(
         hass=hass,
@@ -36,18 +169,58 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         name=name,
         guid=guid,
         relaxed_telemetry=relaxed,
+        flush_window=flush_window_ms / 1000.0,
+        transport=_get_transport(hass),
+        profile_fields=profile_fields,
+        temperature_precision=temperature_precision,
+        unique_host=unique_host,
+        capture=capture,
     )
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {"controller": controller}
+    # Seed entities with the last known state instead of "unknown"
+    store = _store(hass, entry)
+    snapshot = await store.async_load()
+    if snapshot:
+        controller.restore(snapshot)
 
-    # Start UDP controller (HELLO/INIT) in the background
-    hass.async_create_task(controller.async_start())
-    _LOGGER.info("Tylo Sauna: controller scheduled for %s:%s", host, port)
+    controller.register_callback(
+        lambda changed: store.async_delay_save(controller.snapshot, STORAGE_SAVE_DELAY),
+        SNAPSHOT_FIELDS,
+    )
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+        "controller": controller,
+        "store": store,
+        "settings": settings,
+        "options": dict(entry.options),
+    }
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
+    # Follow the sauna to a new address when its GUID is broadcast from one
+    if guid:
+
+        @callback
+        def _async_rehome(sauna: DiscoveredSauna) -> None:
+            if sauna.guid != guid or sauna.host == controller.host:
+                return
+            controller.set_host(sauna.host)
+            hass.config_entries.async_update_entry(
+                entry,
+                data={
+                    **entry.data,
+                    "host": sauna.host,
+                    "unique_host": controller.unique_host,
+                },
+            )
 
-    # Start keepalive loop after Home Assistant is fully started
-    async def _start_keepalive(event):
-        await controller.async_start_keepalive()
+        listener = await async_get_discovery(hass)
+        if listener is not None:
+            entry.async_on_unload(listener.register_callback(_async_rehome))
+            for sauna in listener.saunas():
+                _async_rehome(sauna)
 
-    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, _start_keepalive)
+    # Start UDP controller (HELLO/INIT) in the background; the keepalive loop
+    # starts as soon as the handshake is done.
+    hass.async_create_task(controller.async_start())
+    _LOGGER.info("Tylo Sauna: controller scheduled for %s:%s", host, port)
 
     # Forward the entry to platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -55,9 +228,35 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """
+    Reload the entry when its options changed.
+
+    Re-homing also updates the entry (data only); the controller follows the
+    new address itself, so that must not reload.
+    """
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if data is not None and data["options"] == dict(entry.options):
+        return
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a Tylo Sauna config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok and DOMAIN in hass.data:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
+        data = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if data:
+            controller: SaunaController = data["controller"]
+            await controller.async_stop()
+            await data["store"].async_save(controller.snapshot())
+        transport: SaunaTransport | None = hass.data[DOMAIN].get(DATA_TRANSPORT)
+        if transport is not None and not transport.controllers:
+            transport.close()
+            hass.data[DOMAIN].pop(DATA_TRANSPORT)
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the stored state snapshot of a deleted entry."""
+    await _store(hass, entry).async_remove()
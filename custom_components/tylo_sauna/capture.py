@@ -0,0 +1,211 @@
+"""
+Binary capture of received datagrams, for long-running field diagnostics.
+
+File layout (little endian):
+
+    header  "TYLOCAP1" | wall clock (f64) | monotonic clock (f64) at creation
+    record  payload length (u16) | monotonic ts (f64) | IPv4 (4s) | port (u16) | payload
+
+Records are length-prefixed and never rewritten, so a file can be scanned
+through mmap without loading it (see iter_capture). Writes are buffered and
+done in the executor; files rotate to <name>.1 … <name>.<backups> by size
+and whenever a new writer starts, so every file has a single clock origin.
+"""
+import asyncio
+import logging
+import mmap
+import os
+import socket
+import struct
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_MAGIC = b"TYLOCAP1"
+FILE_HEADER = struct.Struct("<8sdd")
+RECORD_HEADER = struct.Struct("<Hd4sH")
+
+CAPTURE_MAX_BYTES = 64 * 1024 * 1024  # per file before rotating
+CAPTURE_BACKUPS = 3  # rotated files kept
+CAPTURE_FLUSH_BYTES = 64 * 1024  # buffered bytes that trigger a write
+CAPTURE_FLUSH_INTERVAL = 5.0  # seconds a record may wait in the buffer
+CAPTURE_MAX_BUFFER = 4 * 1024 * 1024  # records are dropped beyond this (slow disk)
+
+
+class CaptureWriter:
+    """
+    Append-only, size-rotated capture file.
+
+    record() only packs the datagram into an in-memory buffer; the buffer is
+    handed to the executor when it is large or old enough, with at most one
+    write in flight so records stay in order.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._buffer = bytearray()
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._writing: asyncio.Future | None = None
+        self._fh = None  # only touched in the executor
+        self._started = False  # first file of this writer opened
+        self.records = 0
+        self.dropped = 0  # records lost because the buffer was full
+        self.bytes_written = 0
+
+    def record(self, ts: float, data: bytes, addr) -> None:
+        """Buffer one datagram (event loop, no I/O)."""
+        if len(self._buffer) >= CAPTURE_MAX_BUFFER:
+            self.dropped += 1
+            return
+        src_ip, src_port = addr[0], addr[1]
+        try:
+            packed_ip = socket.inet_aton(src_ip)
+        except OSError:
+            packed_ip = bytes(4)
+        self._buffer += RECORD_HEADER.pack(len(data), ts, packed_ip, src_port)
+        self._buffer += data
+        self.records += 1
+        if len(self._buffer) >= CAPTURE_FLUSH_BYTES:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                CAPTURE_FLUSH_INTERVAL, self._flush
+            )
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._buffer or self._writing is not None:
+            # The running write picks the buffer up when it is done
+            return
+        chunk, self._buffer = bytes(self._buffer), bytearray()
+        self._writing = asyncio.get_running_loop().run_in_executor(None, self._write, chunk)
+        self._writing.add_done_callback(self._write_done)
+
+    def _write_done(self, future: asyncio.Future) -> None:
+        self._writing = None
+        if not future.cancelled() and future.exception() is not None:
+            _LOGGER.warning(
+                "Tylo Sauna: writing capture %s failed: %s", self.path, future.exception()
+            )
+        if len(self._buffer) >= CAPTURE_FLUSH_BYTES:
+            self._flush()
+        elif self._buffer and self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                CAPTURE_FLUSH_INTERVAL, self._flush
+            )
+
+    def _write(self, chunk: bytes) -> None:
+        """Executor: append chunk, rotating the file first if it is full."""
+        if self._fh is not None and self._fh.tell() + len(chunk) > self.max_bytes:
+            self._fh.close()
+            self._fh = None
+            self._rotate()
+        if self._fh is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if not self._started:
+                # The header's clock pair is only valid for this process (the
+                # monotonic clock restarts with the host), so never append to
+                # a file left by an earlier run.
+                self._started = True
+                if self.path.exists() and self.path.stat().st_size:
+                    self._rotate()
+            self._fh = self.path.open("wb")
+            self._fh.write(FILE_HEADER.pack(CAPTURE_MAGIC, time.time(), time.monotonic()))
+        self._fh.write(chunk)
+        self._fh.flush()
+        self.bytes_written += len(chunk)
+
+    def _rotate(self) -> None:
+        for i in range(self.backups, 0, -1):
+            src = self.path if i == 1 else self.path.with_name(f"{self.path.name}.{i - 1}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{i}"))
+        if self.backups == 0 and self.path.exists():
+            self.path.unlink()
+
+    async def async_close(self) -> None:
+        """
+        Write what is buffered and close the file.
+
+        I/O errors are logged, not raised, so a full disk or an unwritable
+        config directory cannot make unloading the entry fail.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        # _write_done may start the next write for what was buffered
+        # meanwhile; _close must not run alongside it
+        while self._writing is not None:
+            try:
+                await asyncio.shield(self._writing)
+            except Exception:  # noqa: BLE001
+                pass  # logged by _write_done
+        loop = asyncio.get_running_loop()
+        chunk, self._buffer = bytes(self._buffer), bytearray()
+        try:
+            await loop.run_in_executor(None, self._close, chunk)
+        except (OSError, ValueError) as exc:
+            _LOGGER.warning("Tylo Sauna: closing capture %s failed: %s", self.path, exc)
+
+    def _close(self, chunk: bytes) -> None:
+        try:
+            if chunk:
+                self._write(chunk)
+        finally:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "records": self.records,
+            "dropped": self.dropped,
+            "bytes_written": self.bytes_written,
+        }
+
+
+def is_capture(path: Path) -> bool:
+    with Path(path).open("rb") as fh:
+        return fh.read(len(CAPTURE_MAGIC)) == CAPTURE_MAGIC
+
+
+def iter_capture(path: Path) -> Iterator[tuple[float, str, int, bytes]]:
+    """
+    Yield (wall clock ts, source IP, source port, payload) for every record.
+
+    The file is memory-mapped, so only the pages being read are loaded. A
+    record cut short by a crash ends the iteration.
+    """
+    with Path(path).open("rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size < FILE_HEADER.size:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            magic, wall0, mono0 = FILE_HEADER.unpack_from(mm, 0)
+            if magic != CAPTURE_MAGIC:
+                raise ValueError(f"{path}: not a Tylo capture file")
+            offset = wall0 - mono0
+            pos = FILE_HEADER.size
+            unpack = RECORD_HEADER.unpack_from
+            hdr = RECORD_HEADER.size
+            ntoa = socket.inet_ntoa
+            while pos + hdr <= size:
+                length, ts, ip, port = unpack(mm, pos)
+                start = pos + hdr
+                pos = start + length
+                if pos > size:
+                    break
+                yield ts + offset, ntoa(ip), port, mm[start:pos]
@@ -8,13 +8,36 @@ from homeassistant.components.climate import (
 )
 from homeassistant.const import UnitOfTemperature, ATTR_TEMPERATURE
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_call_later
 
 from . import DOMAIN
+from .controller import (
+    STATE_CONNECTION,
+    STATE_HEAT,
+    STATE_STALE,
+    STATE_STOP_CFG,
+    STATE_STOP_REM,
+    STATE_T_CUR,
+    STATE_T_SET,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Controller state fields the climate entity displays
+CLIMATE_FIELDS = frozenset(
+    (
+        STATE_HEAT,
+        STATE_T_SET,
+        STATE_T_CUR,
+        STATE_STOP_CFG,
+        STATE_STOP_REM,
+        STATE_CONNECTION,
+        STATE_STALE,
+    )
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
@@ -28,7 +51,12 @@ async def async_setup_entry(
         return
 
     controller = data["controller"]
-    entity = TyloSaunaClimate(controller, entry.entry_id)
+    entity = TyloSaunaClimate(
+        controller,
+        entry.entry_id,
+        min_delta=data["settings"].get("temperature_min_delta", 0.0),
+        min_interval=data["settings"].get("temperature_min_interval", 0),
+    )
     async_add_entities([entity])
     _LOGGER.info("Tylo Sauna climate entity added")
 
@@ -41,18 +69,34 @@ class TyloSaunaClimate(ClimateEntity):
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
     _attr_min_temp = 40.0
     _attr_max_temp = 110.0
-
-    def __init__(self, controller, entry_id: str) -> None:
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        controller,
+        entry_id: str,
+        min_delta: float = 0.0,
+        min_interval: float = 0.0,
+    ) -> None:
         self._controller = controller
         self._entry_id = entry_id
         self._attr_name = controller.name
-        self._attr_unique_id = f"tylo_sauna_{controller.host}_climate"
+        self._attr_unique_id = f"tylo_sauna_{controller.unique_host}_climate"
+
+        # Significance filter for updates that only change the current
+        # temperature: skip changes smaller than min_delta (°C) since the last
+        # written value, and write at most once per min_interval (seconds).
+        self._min_delta = min_delta
+        self._min_interval = min_interval
+        self._written_t_cur: float | None = None
+        self._written_at: float | None = None
+        self._unsub_deferred_write: CALLBACK_TYPE | None = None
 
     @property
     def device_info(self) -> DeviceInfo:
         """Device information shared between entities."""
         return DeviceInfo(
-            identifiers={(DOMAIN, self._controller.host)},
+            identifiers={(DOMAIN, self._controller.unique_host)},
             name=self._controller.name,
             manufacturer="Tylo",
             model="Elite",
@@ -60,7 +104,55 @@ class TyloSaunaClimate(ClimateEntity):
 
     async def async_added_to_hass(self) -> None:
         """Register for state updates from the controller."""
-        self._controller.register_callback(self.async_write_ha_state)
+        self.async_on_remove(
+            self._controller.register_callback(self._handle_controller_update, CLIMATE_FIELDS)
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        if self._unsub_deferred_write is not None:
+            self._unsub_deferred_write()
+            self._unsub_deferred_write = None
+
+    @callback
+    def _handle_controller_update(self, changed: set[str]) -> None:
+        # Other subscribers' fields (e.g. heat rate, updated with every Tcur)
+        # arrive in the same set; only ours decide whether this is Tcur-only
+        if changed & CLIMATE_FIELDS == {STATE_T_CUR} and not self._temperature_change_significant():
+            return
+        self._write_state()
+
+    def _temperature_change_significant(self) -> bool:
+        """False if a current-temperature-only update should be skipped or deferred."""
+        t_cur = self._controller.t_cur_c
+        last = self._written_t_cur
+        if t_cur is None or last is None:
+            return True
+        if abs(t_cur - last) < self._min_delta:
+            return False
+        if self._min_interval and self._written_at is not None:
+            due = self._written_at + self._min_interval
+            if self.hass.loop.time() < due:
+                # Write the latest value once the interval has passed
+                if self._unsub_deferred_write is None:
+                    self._unsub_deferred_write = async_call_later(
+                        self.hass, due - self.hass.loop.time(), self._async_deferred_write
+                    )
+                return False
+        return True
+
+    @callback
+    def _async_deferred_write(self, _now) -> None:
+        self._unsub_deferred_write = None
+        self._write_state()
+
+    @callback
+    def _write_state(self) -> None:
+        if self._unsub_deferred_write is not None:
+            self._unsub_deferred_write()
+            self._unsub_deferred_write = None
+        self._written_t_cur = self._controller.t_cur_c
+        self._written_at = self.hass.loop.time()
+        self.async_write_ha_state()
 
     @property
     def hvac_mode(self) -> HVACMode | None:
@@ -84,7 +176,12 @@ class TyloSaunaClimate(ClimateEntity):
         - stop_after_min (configured)
         - stop_remaining_min (countdown)
         - telemetry_host (if learned in relaxed mode)
+        - connection (connected / degraded / lost)
+        - stale (values restored after a restart, not yet confirmed by telemetry)
         - rx_packets / tx_packets (basic diagnostics)
+        - rx_parsed / rx_deduplicated (telemetry frames parsed vs. skipped as duplicates)
+        - command_latency_ms (average time until telemetry confirmed a command, per kind)
+        - time_to_first_state_s (startup time until the first telemetry state)
         """
         attrs: dict[str, Any] = {}
         if self._controller.stop_cfg_min is not None:
@@ -95,8 +192,26 @@ class TyloSaunaClimate(ClimateEntity):
         if getattr(self._controller, "telemetry_host", None):
             attrs["telemetry_host"] = self._controller.telemetry_host
 
+        if self._controller.stale:
+            attrs["stale"] = True
+
+        if self._controller.connection_state is not None:
+            attrs["connection"] = self._controller.connection_state
+
         attrs["rx_packets"] = getattr(self._controller, "rx_packets", 0)
         attrs["tx_packets"] = getattr(self._controller, "tx_packets", 0)
+        attrs["rx_parsed"] = getattr(self._controller, "rx_parsed", 0)
+        attrs["rx_deduplicated"] = getattr(self._controller, "rx_deduplicated", 0)
+
+        if self._controller.time_to_first_state is not None:
+            attrs["time_to_first_state_s"] = round(self._controller.time_to_first_state, 3)
+
+        command_stats = getattr(self._controller, "command_stats", {})
+        if command_stats:
+            attrs["command_latency_ms"] = {
+                kind: stats.as_dict()["avg_latency_ms"]
+                for kind, stats in command_stats.items()
+            }
 
         return attrs
 
@@ -1,46 +1,72 @@
-import asyncio
 import logging
-import re
-from dataclasses import dataclass
+from collections.abc import Mapping
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 
-from . import DOMAIN
+from . import DOMAIN, async_get_discovery
+from .discovery import DiscoveredSauna
+from .protocol import CONTROL_PORT
 
 _LOGGER = logging.getLogger(__name__)
 
-UDP_DISCOVERY_PORTS = (54377, 54378)
-UDP_DISCOVERY_TIMEOUT = 10.0  # seconds to listen for broadcast
-UUID_RE = re.compile(
-    rb"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
-)
-
-
-@dataclass
-class DiscoveredSauna:
-    host: str
-    guid: str
-
-
-class _DiscoveryProtocol(asyncio.DatagramProtocol):
-    """One-shot UDP discovery protocol used in the config flow."""
-
-    def __init__(self, found: dict[str, DiscoveredSauna]):
-        self.found = found
-
-    def datagram_received(self, data: bytes, addr):
-        host, _port = addr
-        match = UUID_RE.search(data)
-        if not match:
-            return
-        guid = match.group(0).decode("ascii")
-        if guid not in self.found:
-            _LOGGER.debug("Tylo Sauna discovery: found %s at %s", guid, host)
-            self.found[guid] = DiscoveredSauna(host=host, guid=guid)
+UDP_DISCOVERY_TIMEOUT = 10.0  # seconds to listen for broadcast at most
+MAX_FLUSH_WINDOW_MS = 5000  # upper bound for coalescing entity updates
+MAX_TEMPERATURE_PRECISION = 1.0  # °C, coarsest rounding of the current temperature
+MAX_TEMPERATURE_MIN_DELTA = 5.0  # °C
+MAX_TEMPERATURE_MIN_INTERVAL = 600  # seconds
+MAX_CAPTURE_MB = 4096  # per capture file
+
+
+def _tuning_schema(current: Mapping[str, Any] | None = None) -> dict:
+    """
+    Optional settings shared by the discovery and manual forms and the
+    options flow; current supplies the defaults (the entry's settings).
+    """
+    values = _tuning_data(current or {})
+    return {
+        vol.Optional("relaxed_telemetry", default=values["relaxed_telemetry"]): bool,
+        vol.Optional("flush_window_ms", default=values["flush_window_ms"]): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=MAX_FLUSH_WINDOW_MS)
+        ),
+        vol.Optional("profile_fields", default=values["profile_fields"]): bool,
+        vol.Optional(
+            "temperature_precision", default=values["temperature_precision"]
+        ): vol.All(
+            vol.Coerce(float), vol.Range(min=0.0, max=MAX_TEMPERATURE_PRECISION)
+        ),
+        vol.Optional(
+            "temperature_min_delta", default=values["temperature_min_delta"]
+        ): vol.All(
+            vol.Coerce(float), vol.Range(min=0.0, max=MAX_TEMPERATURE_MIN_DELTA)
+        ),
+        vol.Optional(
+            "temperature_min_interval", default=values["temperature_min_interval"]
+        ): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=MAX_TEMPERATURE_MIN_INTERVAL)
+        ),
+        vol.Optional("capture", default=values["capture"]): bool,
+        vol.Optional("capture_max_mb", default=values["capture_max_mb"]): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_CAPTURE_MB)
+        ),
+    }
+
+
+def _tuning_data(user_input: Mapping[str, Any]) -> dict[str, Any]:
+    """Entry data for the optional settings, with defaults applied."""
+    return {
+        "relaxed_telemetry": user_input.get("relaxed_telemetry", True),
+        "flush_window_ms": user_input.get("flush_window_ms", 0),
+        "profile_fields": user_input.get("profile_fields", False),
+        "temperature_precision": user_input.get("temperature_precision", 0.0),
+        "temperature_min_delta": user_input.get("temperature_min_delta", 0.0),
+        "temperature_min_interval": user_input.get("temperature_min_interval", 0),
+        "capture": user_input.get("capture", False),
+        "capture_max_mb": user_input.get("capture_max_mb", 64),
+    }
 
 
 class TyloSaunaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -51,49 +77,42 @@ class TyloSaunaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     def __init__(self) -> None:
         self._discovered: dict[str, DiscoveredSauna] = {}
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> "TyloSaunaOptionsFlow":
+        return TyloSaunaOptionsFlow()
+
     async def _async_discover(self, hass: HomeAssistant) -> list[DiscoveredSauna]:
         """
-        Listen for Tylo broadcasts on the local network for a short period.
-        This is only used when the user opens the Add Integration wizard.
+        Saunas that broadcast recently.
+
+        The background listener's cache is used when it has entries; otherwise
+        wait until the first broadcast arrives plus a short quiet period
+        (at most UDP_DISCOVERY_TIMEOUT).
         """
-        found: dict[str, DiscoveredSauna] = {}
-        loop = hass.loop
-        transports: list[asyncio.DatagramTransport] = []
-
-        for port in UDP_DISCOVERY_PORTS:
-            try:
-                transport, _protocol = await loop.create_datagram_endpoint(
-                    lambda: _DiscoveryProtocol(found),
-                    local_addr=("0.0.0.0", port),
-                )
-                transports.append(transport)
-                _LOGGER.debug("Tylo Sauna discovery(user): listening on UDP %s", port)
-            except OSError as exc:
-                _LOGGER.debug(
-                    "Tylo Sauna discovery(user): cannot bind %s: %s", port, exc
-                )
-
-        if not transports:
-            _LOGGER.debug("Tylo Sauna discovery(user): no UDP sockets opened")
+        listener = await async_get_discovery(hass)
+        if listener is None:
+            _LOGGER.debug("Tylo Sauna discovery(user): listener not available")
             return []
 
-        try:
-            await asyncio.sleep(UDP_DISCOVERY_TIMEOUT)
-        finally:
-            for t in transports:
-                t.close()
-
-        devices = list(found.values())
-
         # Filter out saunas that already have a config entry
         existing_entries = hass.config_entries.async_entries(DOMAIN)
         known_guids = {e.data.get("guid") for e in existing_entries if e.data.get("guid")}
         known_hosts = {e.data.get("host") for e in existing_entries if e.data.get("host")}
 
-        filtered = [
-            s for s in devices
-            if s.guid not in known_guids and s.host not in known_hosts
-        ]
+        def _new(saunas: list[DiscoveredSauna]) -> list[DiscoveredSauna]:
+            return [
+                s for s in saunas
+                if s.guid not in known_guids and s.host not in known_hosts
+            ]
+
+        devices = listener.saunas()
+        filtered = _new(devices)
+        if not filtered:
+            devices = await listener.async_wait(UDP_DISCOVERY_TIMEOUT)
+            filtered = _new(devices)
 
         _LOGGER.debug(
             "Tylo Sauna discovery(user): found %d new, %d total, %d filtered out",
@@ -112,7 +131,7 @@ class TyloSaunaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            relaxed = user_input.get("relaxed_telemetry", True)
+            tuning = _tuning_data(user_input)
 
             # Device selected from discovery list
             if "device" in user_input and user_input["device"] != "__manual__":
@@ -129,17 +148,17 @@ class TyloSaunaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
                     data = {
                         "host": host,
-                        "port": 42156,
+                        "port": CONTROL_PORT,
                         "name": name,
                         "guid": sauna.guid,
-                        "relaxed_telemetry": relaxed,
+                        **tuning,
                     }
                     return self.async_create_entry(title=name, data=data)
 
             # Manual host entry
             if "host" in user_input and user_input["host"]:
                 host = user_input["host"]
-                port = user_input.get("port", 42156)
+                port = user_input.get("port", CONTROL_PORT)
                 name = user_input.get("name") or f"Tylo Sauna {host}"
 
                 await self.async_set_unique_id(host)
@@ -149,7 +168,7 @@ class TyloSaunaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     "host": host,
                     "port": port,
                     "name": name,
-                    "relaxed_telemetry": relaxed,
+                    **tuning,
                 }
                 return self.async_create_entry(title=name, data=data)
 
@@ -172,9 +191,9 @@ class TyloSaunaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 {
                     vol.Required("device", default=list(options.keys())[0]): vol.In(options),
                     vol.Optional("host"): str,
-                    vol.Optional("port", default=42156): int,
+                    vol.Optional("port", default=CONTROL_PORT): int,
                     vol.Optional("name", default="Tylo Sauna"): str,
-                    vol.Optional("relaxed_telemetry", default=True): bool,
+                    **_tuning_schema(),
                 }
             )
             return self.async_show_form(
@@ -187,9 +206,30 @@ class TyloSaunaConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         schema = vol.Schema(
             {
                 vol.Required("host"): str,
-                vol.Optional("port", default=42156): int,
+                vol.Optional("port", default=CONTROL_PORT): int,
                 vol.Optional("name", default="Tylo Sauna"): str,
-                vol.Optional("relaxed_telemetry", default=True): bool,
+                **_tuning_schema(),
             }
         )
         return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
+
+
+class TyloSaunaOptionsFlow(config_entries.OptionsFlow):
+    """
+    Change the optional settings after setup.
+
+    They are stored in entry.options, which override the values entered at
+    setup; the entry reloads to apply them.
+    """
+
+    async def async_step_init(self, user_input: dict[str, Any] | None = None):
+        if user_input is not None:
+            return self.async_create_entry(title="", data=_tuning_data(user_input))
+
+        # handler is the entry id; config_entry is not set on every HA version
+        entry = self.hass.config_entries.async_get_entry(self.handler)
+        current = {**entry.data, **entry.options}
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(_tuning_schema(current)),
+        )
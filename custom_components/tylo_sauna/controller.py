@@ -1,118 +1,395 @@
 import asyncio
 import logging
-import re
+import math
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from .capture import CaptureWriter
+from .heatup import HEATUP_ETA_STEP, HEATUP_RATE_STEP, HeatupEstimator
+from .history import TelemetryHistory
+from .log import RateLimitedLogger
+from .metrics import ControllerMetrics, FieldProfiler
+from .protocol import (
+    FIELDS_BY_KEY,
+    FIELD_LIGHT,
+    FIELD_STOP_CFG,
+    FIELD_STOP_REM,
+    FIELD_T_CUR,
+    FIELD_T_SET,
+    HEAT_AUX_PAYLOAD,
+    HEAT_OFF_PAYLOAD,
+    HEAT_ON_PAYLOAD,
+    HELLO_PAYLOAD,
+    INIT_SHORT,
+    LIGHT,
+    LIGHT_OFF_PAYLOAD,
+    LIGHT_ON_PAYLOAD,
+    SETSTOP_AUX_PAYLOAD,
+    STOP_CFG,
+    STOP_REM,
+    T_CUR,
+    T_SET,
+    decode_records,
+    encode_set_stop_after,
+    encode_set_temperature,
+    extract_guid,
+    looks_like_telemetry,
+    temperature_to_raw,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 KEEPALIVE_INTERVAL = 15  # seconds, matches official app behavior
 
-# HELLO / INIT packets reverse engineered from the official app
-HELLO_PAYLOAD = bytes.fromhex(
-    "c23e33081412043030303028542879286c28f601282028722865286d286f28"
-    "74286528202863286f286e28742872286f286c3a025001"
+# Adaptive keepalive: fewer keepalives while telemetry flows, faster recovery
+# (HELLO/INIT handshake with exponential backoff) once it stops.
+KEEPALIVE_INTERVAL_HEALTHY = 30  # seconds, while telemetry is fresh
+TELEMETRY_STALE_AFTER = 20  # seconds without telemetry -> degraded
+TELEMETRY_LOST_AFTER = 60   # seconds without telemetry -> lost
+RECONNECT_BACKOFF_MIN = 1.0  # seconds
+RECONNECT_BACKOFF_MAX = 60.0
+
+# Startup/recovery handshake: HELLO + INIT, then wait for the first telemetry
+# frame instead of sleeping for fixed delays.
+HANDSHAKE_TIMEOUT = 1.0  # seconds to wait for telemetry per attempt
+HANDSHAKE_ATTEMPTS = 3
+
+# Connection health (SaunaController.connection_state)
+CONNECTION_CONNECTED = "connected"
+CONNECTION_DEGRADED = "degraded"
+CONNECTION_LOST = "lost"
+
+# Commands are confirmed by the telemetry field they change; unconfirmed
+# commands are resent with exponential backoff.
+COMMAND_TIMEOUT = 2.0  # seconds to wait for the first confirmation
+COMMAND_BACKOFF = 2.0  # timeout multiplier per retry
+COMMAND_RETRIES = 3
+
+# Setpoint commands (temperature, stop time) are held back this long so that a
+# burst of slider changes collapses into one command carrying the last value.
+SETPOINT_DEBOUNCE = 0.3  # seconds
+
+SETSTOP_AUX_DELAY = 0.02  # seconds between SETSTOP and its aux packet
+
+# State fields reported to entity callbacks (names of SaunaController attributes)
+STATE_LIGHT = LIGHT.name
+STATE_HEAT = "heat"  # derived: StopRem > 0
+STATE_T_SET = T_SET.name
+STATE_T_CUR = T_CUR.name
+STATE_STOP_CFG = STOP_CFG.name
+STATE_STOP_REM = STOP_REM.name
+STATE_CONNECTION = "connection_state"
+STATE_STALE = "stale"
+STATE_HEAT_RATE = "heat_rate_c_min"  # derived: fitted rate of rise
+STATE_HEATUP_ETA = "heatup_eta_min"  # derived: minutes until Tcur reaches Tset
+
+# State fields persisted across restarts (see SaunaController.snapshot)
+SNAPSHOT_FIELDS = (
+    STATE_LIGHT,
+    STATE_HEAT,
+    STATE_T_SET,
+    STATE_T_CUR,
+    STATE_STOP_CFG,
+    STATE_STOP_REM,
 )
-INIT_SHORT = bytes.fromhex("8241020802")
 
-# Light commands
-LIGHT_OFF_PAYLOAD = bytes.fromhex("a24204080a1000")
-LIGHT_ON_PAYLOAD  = bytes.fromhex("a24204080a1001")
+# State fields sampled into SaunaController.history
+HISTORY_FIELDS = frozenset((STATE_HEAT, STATE_T_SET, STATE_T_CUR, STATE_STOP_REM))
 
-# Heating commands
-HEAT_ON_PAYLOAD  = bytes.fromhex("c24302500b")
-HEAT_OFF_PAYLOAD = bytes.fromhex("c24302500a")
-HEAT_AUX_PAYLOAD = bytes.fromhex("d23e02081f")  # extra packet sent by the app for HEAT
+# Command kinds (keys of SaunaController.command_stats)
+CMD_LIGHT = "light"
+CMD_HEAT = "heat"
+CMD_SET_TEMPERATURE = "set_temperature"
+CMD_SET_STOP_AFTER = "set_stop_after"
 
-UUID_RE = re.compile(
-    rb"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
-)
+# Per-sender memo of SaunaTransport's relaxed-mode checks
+SOURCE_CACHE_SIZE = 256       # senders remembered
+SOURCE_REJECT_TTL = 60.0      # seconds a GUID-mismatched sender is dropped without checks
 
 
-def _decode_varint(data: bytes, start: int):
-    """Simple protobuf varint decoder."""
-    result = 0
-    shift = 0
-    i = start
-    while i < len(data):
-        b = data[i]
-        result |= (b & 0x7F) << shift
-        if not (b & 0x80):
-            return result, i + 1
-        shift += 7
-        i += 1
-    return None, start
-
-
-def _encode_varint(value: int) -> bytes:
-    """Encode an integer as protobuf varint."""
-    out = bytearray()
-    v = int(value)
-    if v < 0:
-        raise ValueError("varint only supports non-negative integers")
-    while True:
-        b = v & 0x7F
-        v >>= 7
-        if v:
-            out.append(b | 0x80)
-        else:
-            out.append(b)
-            break
-    return bytes(out)
+class _SourceCache:
+    """
+    Bounded memo of relaxed-mode checks per sender IP.
 
+    - senders whose telemetry carries another sauna's GUID are dropped with
+      one dict lookup until SOURCE_REJECT_TTL expires
+    - the GUID found in a sender's telemetry is remembered, so UUID_RE runs
+      once per sender instead of once per datagram
+    """
 
-def _parse_varint_after(data: bytes, pattern_hex: str):
-    """Find varint immediately after a given hex pattern."""
-    pattern = bytes.fromhex(pattern_hex)
-    idx = data.find(pattern)
-    if idx == -1:
-        return None
-    val, _ = _decode_varint(data, idx + len(pattern))
-    return val
+    def __init__(self) -> None:
+        self._rejected_until: dict[str, float] = {}
+        self._guids: dict[str, str] = {}
 
+    def is_rejected(self, src_ip: str) -> bool:
+        until = self._rejected_until.get(src_ip)
+        if until is None:
+            return False
+        if time.monotonic() < until:
+            return True
+        del self._rejected_until[src_ip]
+        return False
+
+    def reject(self, src_ip: str) -> None:
+        _bounded_put(self._rejected_until, src_ip, time.monotonic() + SOURCE_REJECT_TTL)
+
+    def guid(self, src_ip: str, data: bytes) -> str | None:
+        guid = self._guids.get(src_ip)
+        if guid is None:
+            guid = extract_guid(data)
+            if guid is not None:
+                _bounded_put(self._guids, src_ip, guid)
+        return guid
+
+    def clear(self) -> None:
+        self._rejected_until.clear()
+        self._guids.clear()
+
+
+def _bounded_put(cache: dict, key, value) -> None:
+    """Insert into a dict used as a FIFO cache of SOURCE_CACHE_SIZE entries."""
+    if key not in cache and len(cache) >= SOURCE_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+
+@dataclass
+class _Command:
+    """A command waiting for telemetry to confirm it."""
+
+    kind: str
+    packets: tuple[tuple[bytes, str], ...]
+    state_field: str  # STATE_* field the command changes
+    expected: Any     # value of that field once the command is applied
+    gap: float = 0.0  # delay between packets
+    debounce: float = 0.0  # hold-back time before the first send
+    transmitted: bool = False
+    superseded: bool = False  # the field changed to another value (e.g. at the panel)
+    confirmed: asyncio.Event = field(default_factory=asyncio.Event)  # or superseded
+
+
+@dataclass
+class CommandStats:
+    """Per command kind delivery statistics."""
+
+    sent: int = 0
+    confirmed: int = 0
+    retries: int = 0
+    failed: int = 0
+    collapsed: int = 0  # replaced by a newer command before it was sent
+    replaced: int = 0   # replaced by a newer command while awaiting confirmation
+    superseded: int = 0  # field changed to another value; retries stopped
+    last_latency: float | None = None  # seconds from first send to confirmation
+    total_latency: float = 0.0
+
+    @property
+    def avg_latency(self) -> float | None:
+        if not self.confirmed:
+            return None
+        return self.total_latency / self.confirmed
 
-def _extract_guid_from_payload(data: bytes) -> str | None:
-    """Try to extract a GUID/UUID from payload as a hint."""
-    m = UUID_RE.search(data)
-    if not m:
-        return None
-    return m.group(0).decode("ascii")
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "confirmed": self.confirmed,
+            "retries": self.retries,
+            "failed": self.failed,
+            "collapsed": self.collapsed,
+            "replaced": self.replaced,
+            "superseded": self.superseded,
+            "last_latency_ms": _ms(self.last_latency),
+            "avg_latency_ms": _ms(self.avg_latency),
+        }
 
 
-def _looks_like_tylo_telemetry(data: bytes) -> bool:
-    """
-    Heuristic check to avoid accepting random UDP noise when relaxed mode is enabled.
-    """
-    markers = (
-        b"\xd2\x7d\x05\x08\x0a\x10",  # Tset
-        b"\xd2\x7d\x05\x08\x0c\x10",  # Tcur
-        b"\xd2\x7d\x04\x08\x11\x10",  # StopCfg alt
-        b"\xd2\x7d\x05\x08\x11\x10",  # StopCfg
-        b"\xd2\x7d\x04\x08\x16\x10",  # StopRem alt
-        b"\xd2\x7d\x05\x08\x16\x10",  # StopRem
-        b"\xda\x7d\x04\x08\x0a\x10",  # Light flag
-    )
-    return any(m in data for m in markers)
+def _fmt_temp(value: float | None) -> str:
+    return f"{value:.1f}" if value is not None else "?"
+
+
+def _moved(value: float | None, published: float | None, step: float) -> bool:
+    """True if value should replace published (appeared, vanished or moved a step)."""
+    if value is None or published is None:
+        return value is not published
+    return abs(value - published) >= step
+
+
+def _ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000.0, 1) if seconds is not None else None
 
 
 class SaunaProtocol(asyncio.DatagramProtocol):
-    """Asyncio protocol used by SaunaController."""
+    """Asyncio protocol used by SaunaTransport."""
 
-    def __init__(self, controller: "SaunaController"):
-        self.controller = controller
+    def __init__(self, receiver: "SaunaTransport"):
+        self.receiver = receiver
         self.transport: asyncio.DatagramTransport | None = None
 
     def connection_made(self, transport: asyncio.BaseTransport) -> None:
         self.transport = transport  # type: ignore[assignment]
-        self.controller.connection_made(self.transport)  # type: ignore[arg-type]
+        self.receiver.connection_made(self.transport)  # type: ignore[arg-type]
 
     def datagram_received(self, data: bytes, addr) -> None:
-        self.controller.datagram_received(data, addr)
+        self.receiver.datagram_received(data, addr)
 
     def error_received(self, exc: Exception) -> None:
         _LOGGER.warning("Tylo Sauna UDP error: %s", exc)
 
     def connection_lost(self, exc: Exception | None) -> None:
         _LOGGER.info("Tylo Sauna UDP connection lost: %s", exc)
-        self.controller.connection_lost(exc)
+        self.receiver.connection_lost(exc)
+
+
+class SaunaTransport:
+    """
+    UDP socket shared by all SaunaControllers of one Home Assistant instance.
+
+    Incoming datagrams are routed to the controller that owns the sender IP
+    with a dict lookup. Only datagrams from unknown senders go through the
+    relaxed-mode telemetry/GUID heuristics, once per datagram, and only while
+    some relaxed controller has not pinned its telemetry_host yet.
+    """
+
+    def __init__(self) -> None:
+        self._transport: asyncio.DatagramTransport | None = None
+        self._lock = asyncio.Lock()
+        self._controllers: list[SaunaController] = []
+
+        # Routing tables, rebuilt by reindex()
+        self._by_host: dict[str, SaunaController] = {}
+        self._learning: list[SaunaController] = []
+
+        self._sources = _SourceCache()
+        self._log = RateLimitedLogger(_LOGGER)
+
+        # Datagrams no controller accepted
+        self.unrouted: int = 0
+        self.guid_mismatch: int = 0
+
+    @property
+    def controllers(self) -> list["SaunaController"]:
+        return list(self._controllers)
+
+    async def async_attach(self, controller: "SaunaController") -> asyncio.DatagramTransport:
+        """Route telemetry for controller; opens the socket on first use."""
+        async with self._lock:
+            if self._transport is None:
+                loop = asyncio.get_running_loop()
+                self._transport, _protocol = await loop.create_datagram_endpoint(
+                    lambda: SaunaProtocol(self),
+                    local_addr=("0.0.0.0", 0),
+                )
+        if controller not in self._controllers:
+            self._controllers.append(controller)
+            self.reindex()
+        return self._transport
+
+    def detach(self, controller: "SaunaController") -> None:
+        """Stop routing telemetry to controller."""
+        if controller in self._controllers:
+            self._controllers.remove(controller)
+            self.reindex()
+
+    def close(self) -> None:
+        """Close the shared socket."""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def reindex(self) -> None:
+        """Rebuild routing tables after a controller was added, removed or pinned."""
+        by_host: dict[str, SaunaController] = {}
+        learning: list[SaunaController] = []
+        for controller in self._controllers:
+            host = controller.routing_host
+            if host in by_host:
+                _LOGGER.warning(
+                    "Tylo Sauna: %s and %s both use host %s; telemetry goes to %s",
+                    by_host[host].name, controller.name, host, controller.name,
+                )
+            by_host[host] = controller
+            if controller.relaxed_telemetry and controller.telemetry_host is None:
+                learning.append(controller)
+        self._by_host = by_host
+        self._learning = learning
+        # Verdicts depend on which controllers are learning
+        self._sources.clear()
+
+    # === Network events ===
+
+    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
+        sockname = transport.get_extra_info("sockname")
+        _LOGGER.info("Tylo Sauna: UDP socket bound on %s", sockname)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        _LOGGER.info("Tylo Sauna: connection lost: %s", exc)
+        self._transport = None
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        controller = self._by_host.get(addr[0])
+        if controller is not None:
+            controller.datagram_received(data, addr)
+            return
+        if self._learning:
+            self._route_unknown_sender(data, addr)
+        else:
+            self.unrouted += 1
+
+    def _route_unknown_sender(self, data: bytes, addr) -> None:
+        """Offer a datagram from an unknown sender to a relaxed, unpinned controller."""
+        src_ip = addr[0]
+        if self._sources.is_rejected(src_ip):
+            self._count_unrouted()
+            return
+        if not looks_like_telemetry(data):
+            # Not remembered: a sauna's own status or discovery packets must
+            # not keep its telemetry from being learned
+            _LOGGER.debug("Tylo Sauna: ignoring non-telemetry UDP packet from %s", src_ip)
+            self._count_unrouted()
+            return
+
+        pkt_guid = self._sources.guid(src_ip, data)
+        target = None
+        for controller in self._learning:
+            if pkt_guid and controller.guid == pkt_guid:
+                target = controller
+                break
+            if target is None and not (pkt_guid and controller.guid):
+                target = controller
+
+        if target is None:
+            self._sources.reject(src_ip)
+            self.guid_mismatch += 1
+            for controller in self._learning:
+                controller.metrics.filtered += 1
+                controller.metrics.guid_mismatch += 1
+            self._log.warning(
+                src_ip,
+                "guid_mismatch",
+                "Tylo Sauna: telemetry GUID mismatch from %s: packet_guid=%s. Ignoring.",
+                src_ip, pkt_guid,
+            )
+            return
+
+        target.pin_telemetry_host(src_ip, pkt_guid)
+        target.datagram_received(data, addr)
+
+    def _count_unrouted(self) -> None:
+        """A datagram no controller accepted; the learners would have seen it."""
+        self.unrouted += 1
+        for controller in self._learning:
+            controller.metrics.filtered += 1
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "controllers": len(self._controllers),
+            "routes": sorted(self._by_host),
+            "learning": [c.name for c in self._learning],
+            "unrouted": self.unrouted,
+            "guid_mismatch": self.guid_mismatch,
+            "log": self._log.as_dict(),
+        }
 
 
 class SaunaController:
@@ -133,18 +410,31 @@ class SaunaController:
         name: str,
         guid: str | None = None,
         relaxed_telemetry: bool = True,
+        flush_window: float = 0.0,
+        transport: SaunaTransport | None = None,
+        profile_fields: bool = False,
+        temperature_precision: float = 0.0,
+        unique_host: str | None = None,
+        capture: CaptureWriter | None = None,
     ) -> None:
         self._hass = hass
         self.host = host
+        # Address the entity unique ids were created with; stays the same when
+        # the sauna moves to a new address (see set_host)
+        self.unique_host = unique_host or host
         self.port = port
         self.name = name
 
         self.guid = guid
         self.relaxed_telemetry = relaxed_telemetry
 
+        # Shared socket/dispatcher; a private one is created if none is given
+        self._udp = transport
         self._transport: asyncio.DatagramTransport | None = None
-        self._protocol: SaunaProtocol | None = None
+        self._owns_udp = False  # private transport, closed by async_stop
+        self._init_task: asyncio.Task | None = None
         self._keepalive_task: asyncio.Task | None = None
+        self._stopped = False
 
         # Learned telemetry sender (may differ from configured host)
         self.telemetry_host: str | None = None
@@ -156,249 +446,718 @@ class SaunaController:
         self.t_cur_c: float | None = None
         self.stop_cfg_min: int | None = None   # configured Stop after (minutes)
         self.stop_rem_min: int | None = None   # remaining time to auto-off (minutes)
+        self.stale: bool = False  # state restored from a snapshot, not yet confirmed
+
+        # Heat-up estimate, fitted incrementally from Tcur
+        self.heatup = HeatupEstimator()
+        self.heat_rate_c_min: float | None = None
+        self.heatup_eta_min: int | None = None
 
         # Diagnostics
         self.rx_packets: int = 0
         self.tx_packets: int = 0
         self.last_rx_monotonic: float | None = None
-
-        # Entity callbacks (climate, light, number, sensor)
-        self._callbacks: list[callable] = []
+        self.connection_state: str | None = None  # CONNECTION_*, None before start
+        self.time_to_first_state: float | None = None  # seconds from start to first state
+        self._started_monotonic: float | None = None
+        self._rx_event = asyncio.Event()  # set whenever telemetry is accepted
+        self.rx_parsed: int = 0          # datagrams passed to the telemetry parser
+        self.rx_deduplicated: int = 0    # datagrams identical to the previous one
+
+        # Commands waiting for telemetry confirmation, by kind
+        self._commands: dict[str, _Command] = {}
+        self._command_tasks: dict[str, tuple[_Command, asyncio.Task]] = {}
+        self.command_stats: dict[str, CommandStats] = {}
+
+        # Hot-path instrumentation (histograms and drop counters)
+        self.metrics = ControllerMetrics()
+
+        # Warnings caused by other hosts' packets, at most one per sender and
+        # reason per LOG_REPEAT_INTERVAL
+        self._log = RateLimitedLogger(_LOGGER)
+
+        # Opt-in statistics of every telemetry record, including unknown ones
+        self.field_profiler: FieldProfiler | None = FieldProfiler() if profile_fields else None
+
+        # Recent state changes, for the get_history service
+        self.history = TelemetryHistory()
+
+        # Opt-in binary capture of every datagram routed to this controller
+        self.capture = capture
+
+        # Last accepted payload per sender, used to skip unchanged telemetry
+        self._last_payload: dict[str, bytes] = {}
+
+        # Entity callbacks (climate, light, number, sensor) with the state
+        # fields each one subscribed to (None = all fields)
+        self._callbacks: list[tuple[Callable[[set[str]], None], frozenset[str] | None]] = []
+
+        # Optional rounding of Tcur (°C, 0 = native 1/9 °C steps); changes
+        # smaller than this never reach the entities or the recorder
+        self.temperature_precision = temperature_precision
+
+        # Optional coalescing of entity updates (seconds, 0 = notify immediately)
+        self.flush_window = flush_window
+        self._pending_changes: set[str] = set()
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._pending_rx_time: float | None = None
+
+    def snapshot(self) -> dict[str, Any]:
+        """Compact copy of the mirrored state, for persisting across restarts."""
+        return {name: getattr(self, name) for name in SNAPSHOT_FIELDS}
+
+    def restore(self, snapshot: dict[str, Any]) -> None:
+        """
+        Seed state from a snapshot taken before the last restart.
+
+        Values are marked stale until the first telemetry frame is parsed.
+        """
+        restored = False
+        for name in SNAPSHOT_FIELDS:
+            value = snapshot.get(name)
+            if value is not None and getattr(self, name) is None:
+                setattr(self, name, value)
+                restored = True
+        if restored:
+            self.stale = True
+
+    def diagnostics(self) -> dict[str, Any]:
+        """Runtime state and metrics for the diagnostics download."""
+        return {
+            "host": self.host,
+            "unique_host": self.unique_host,
+            "port": self.port,
+            "telemetry_host": self.telemetry_host,
+            "relaxed_telemetry": self.relaxed_telemetry,
+            "connection_state": self.connection_state,
+            "stale": self.stale,
+            "state": self.snapshot(),
+            "heat_rate_c_min": self.heat_rate_c_min,
+            "heatup_eta_min": self.heatup_eta_min,
+            "time_to_first_state": self.time_to_first_state,
+            "rx_packets": self.rx_packets,
+            "rx_parsed": self.rx_parsed,
+            "rx_deduplicated": self.rx_deduplicated,
+            "tx_packets": self.tx_packets,
+            "history_samples": len(self.history),
+            "commands": {k: v.as_dict() for k, v in self.command_stats.items()},
+            "metrics": self.metrics.as_dict(),
+            "log": self._log.as_dict(),
+            "capture": self.capture.as_dict() if self.capture is not None else None,
+            "field_profile": (
+                self.field_profiler.as_dict({k: f.name for k, f in FIELDS_BY_KEY.items()})
+                if self.field_profiler is not None
+                else None
+            ),
+        }
+
+    @property
+    def transport(self) -> "SaunaTransport | None":
+        """Shared UDP socket this controller is attached to."""
+        return self._udp
+
+    @property
+    def routing_host(self) -> str:
+        """Sender IP whose datagrams SaunaTransport routes to this controller."""
+        if self.relaxed_telemetry and self.telemetry_host is not None:
+            return self.telemetry_host
+        return self.host
 
     async def async_start(self) -> None:
-        """Create UDP socket and send initial HELLO/INIT sequence."""
-        loop = self._hass.loop
-        _LOGGER.info("Tylo Sauna: creating UDP endpoint for %s:%s", self.host, self.port)
+        """Attach to the UDP socket and send initial HELLO/INIT sequence."""
+        _LOGGER.info("Tylo Sauna: attaching UDP endpoint for %s:%s", self.host, self.port)
+        self._stopped = False
+        self._started_monotonic = asyncio.get_running_loop().time()
+        if self._udp is None:
+            self._udp = SaunaTransport()
+            self._owns_udp = True
+        self._transport = await self._udp.async_attach(self)
+        if self._stopped:
+            # async_stop ran while the socket was being opened
+            self._release_transport()
+            return
 
-        self._transport, self._protocol = await loop.create_datagram_endpoint(
-            lambda: SaunaProtocol(self),
-            local_addr=("0.0.0.0", 0),
+        # Background tasks: Home Assistant does not wait for them to finish
+        # before it completes startup (the keepalive never finishes)
+        self._init_task = self._hass.async_create_background_task(
+            self._async_init_sequence(), name=f"tylo_sauna {self.host} init"
         )
 
-        self._hass.create_task(self._async_init_sequence())
+    async def async_stop(self) -> None:
+        """
+        Stop the controller: cancel the handshake, keepalive and command tasks,
+        drop pending entity updates, leave the UDP socket and forget all
+        callbacks. Safe to call more than once.
+        """
+        self._stopped = True
+        tasks = [t for t in (self._init_task, self._keepalive_task) if t is not None]
+        tasks.extend(task for _cmd, task in self._command_tasks.values())
+        self._init_task = None
+        self._keepalive_task = None
+        self._command_tasks.clear()
+        self._commands.clear()
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._pending_changes.clear()
+        self._pending_rx_time = None
+
+        self._release_transport()
+        self._callbacks.clear()
+        if self.capture is not None:
+            await self.capture.async_close()
+        _LOGGER.info("Tylo Sauna: controller for %s stopped", self.host)
+
+    def _release_transport(self) -> None:
+        self._transport = None
+        if self._udp is None:
+            return
+        self._udp.detach(self)
+        if self._owns_udp:
+            self._udp.close()
+            self._udp = None
+            self._owns_udp = False
 
     async def _async_init_sequence(self) -> None:
-        await asyncio.sleep(0.5)
-        self._send(HELLO_PAYLOAD, "HELLO 1")
-        await asyncio.sleep(0.1)
-        self._send(HELLO_PAYLOAD, "HELLO 2")
-        await asyncio.sleep(0.1)
-        self._send(HELLO_PAYLOAD, "HELLO 3")
-        await asyncio.sleep(0.1)
-        self._send(INIT_SHORT, "INIT_SHORT")
+        """Handshake, then start the keepalive right away."""
+        if not await self._async_handshake():
+            _LOGGER.warning(
+                "Tylo Sauna: no telemetry from %s after %d HELLO attempts; "
+                "keepalive will keep retrying",
+                self.host, HANDSHAKE_ATTEMPTS,
+            )
+        await self.async_start_keepalive()
+
+    async def _async_handshake(self) -> bool:
+        """Send HELLO/INIT until a telemetry frame arrives; True on success."""
+        for attempt in range(1, HANDSHAKE_ATTEMPTS + 1):
+            self._rx_event.clear()
+            self._send(HELLO_PAYLOAD, f"HELLO {attempt}")
+            self._send(INIT_SHORT, "INIT_SHORT")
+            try:
+                await asyncio.wait_for(self._rx_event.wait(), HANDSHAKE_TIMEOUT)
+            except asyncio.TimeoutError:
+                continue
+            return True
+        return False
+
+    def _evaluate_connection(self, now: float) -> str:
+        """Derive connection health from the age of the last telemetry frame."""
+        if self.last_rx_monotonic is None:
+            state = CONNECTION_LOST
+        else:
+            age = now - self.last_rx_monotonic
+            if age < TELEMETRY_STALE_AFTER:
+                state = CONNECTION_CONNECTED
+            elif age < TELEMETRY_LOST_AFTER:
+                state = CONNECTION_DEGRADED
+            else:
+                state = CONNECTION_LOST
+        self._set_connection_state(state)
+        return state
+
+    def _set_connection_state(self, state: str) -> None:
+        if state == self.connection_state:
+            return
+        _LOGGER.info(
+            "Tylo Sauna: connection to %s is %s (was %s)",
+            self.host, state, self.connection_state,
+        )
+        self.connection_state = state
+        self._notify_listeners({STATE_CONNECTION})
 
     async def _keepalive_loop(self) -> None:
+        """
+        Keep the telemetry stream alive.
+
+        - connected: INIT_SHORT every KEEPALIVE_INTERVAL_HEALTHY
+        - degraded: INIT_SHORT every KEEPALIVE_INTERVAL (like the app)
+        - lost: full HELLO/INIT handshake, repeated with exponential backoff
+        """
+        loop = asyncio.get_running_loop()
+        backoff = RECONNECT_BACKOFF_MIN
+        last_sent = loop.time()
         try:
             while True:
-                await asyncio.sleep(KEEPALIVE_INTERVAL)
-                self._send(INIT_SHORT, "KEEPALIVE")
+                now = loop.time()
+                state = self._evaluate_connection(now)
+
+                if state == CONNECTION_LOST:
+                    _LOGGER.debug(
+                        "Tylo Sauna: no telemetry from %s, handshake (next in %.0fs)",
+                        self.host, backoff,
+                    )
+                    await self._async_handshake()
+                    last_sent = loop.time()
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, RECONNECT_BACKOFF_MAX)
+                    continue
+                backoff = RECONNECT_BACKOFF_MIN
+
+                if state == CONNECTION_CONNECTED:
+                    interval = KEEPALIVE_INTERVAL_HEALTHY
+                    next_transition = self.last_rx_monotonic + TELEMETRY_STALE_AFTER
+                else:
+                    interval = KEEPALIVE_INTERVAL
+                    next_transition = self.last_rx_monotonic + TELEMETRY_LOST_AFTER
+
+                if now - last_sent >= interval:
+                    self._send(INIT_SHORT, "KEEPALIVE")
+                    last_sent = now
+
+                # Wake up for the next keepalive or the next health transition,
+                # whichever comes first.
+                await asyncio.sleep(max(min(last_sent + interval, next_transition) - now, 0.1))
         except asyncio.CancelledError:
             _LOGGER.info("Tylo Sauna: keepalive loop cancelled")
             raise
 
     async def async_start_keepalive(self) -> None:
+        if self._stopped:
+            return
         if self._keepalive_task is not None and not self._keepalive_task.done():
             return
         _LOGGER.info("Tylo Sauna: starting keepalive loop")
-        self._keepalive_task = self._hass.create_task(self._keepalive_loop())
+        self._keepalive_task = self._hass.async_create_background_task(
+            self._keepalive_loop(), name=f"tylo_sauna {self.host} keepalive"
+        )
 
     # === Network events ===
 
     def _send(self, payload: bytes, desc: str = "") -> None:
         if not self._transport:
-            _LOGGER.warning("Tylo Sauna: transport not ready, cannot send %s", desc or "")
+            self._log.warning(
+                self.host,
+                "transport_not_ready",
+                "Tylo Sauna: transport not ready, cannot send %s",
+                desc or "",
+            )
             return
         self._transport.sendto(payload, (self.host, self.port))
         self.tx_packets += 1
         if desc:
             _LOGGER.debug("Tylo Sauna: send %s (%d bytes)", desc, len(payload))
 
-    def connection_made(self, transport: asyncio.DatagramTransport) -> None:
-        sockname = transport.get_extra_info("sockname")
-        _LOGGER.info("Tylo Sauna: UDP socket bound on %s", sockname)
-
-    def connection_lost(self, exc: Exception | None) -> None:
-        _LOGGER.info("Tylo Sauna: connection lost: %s", exc)
-
     def datagram_received(self, data: bytes, addr) -> None:
         src_ip, _src_port = addr
 
-        if not self.relaxed_telemetry:
-            # Strict mode: only accept telemetry from configured host
-            if src_ip != self.host:
-                return
-        else:
-            # Relaxed mode: accept telemetry from pinned telemetry_host OR learn it
-            if self.telemetry_host is not None:
-                if src_ip != self.telemetry_host:
-                    _LOGGER.debug(
-                        "Tylo Sauna: ignoring telemetry from %s (pinned telemetry_host=%s)",
-                        src_ip, self.telemetry_host
-                    )
-                    return
-            else:
-                if src_ip == self.host:
-                    # OK, accept packets from configured host
-                    pass
-                else:
-                    # Not from configured host
-                    if not _looks_like_tylo_telemetry(data):
-                        _LOGGER.debug(
-                            "Tylo Sauna: ignoring non-telemetry UDP packet from %s", src_ip
-                        )
-                        return
-
-                    pkt_guid = _extract_guid_from_payload(data)
-                    if self.guid and pkt_guid and pkt_guid != self.guid:
-                        _LOGGER.warning(
-                            "Tylo Sauna: telemetry GUID mismatch from %s: packet_guid=%s, entry_guid=%s. Ignoring.",
-                            src_ip, pkt_guid, self.guid
-                        )
-                        return
-
-                    # Accept & pin
-                    self.telemetry_host = src_ip
-                    _LOGGER.warning(
-                        "Tylo Sauna: telemetry received from %s (configured host=%s). "
-                        "Pinning telemetry_host=%s (guid_hint=%s).",
-                        src_ip, self.host, src_ip, pkt_guid or "n/a"
-                    )
+        if self.capture is not None:
+            self.capture.record(asyncio.get_running_loop().time(), data, addr)
+
+        if not self._source_allowed(src_ip):
+            self.metrics.filtered += 1
+            return
 
         self.rx_packets += 1
         self.last_rx_monotonic = asyncio.get_running_loop().time()
+        if self.connection_state != CONNECTION_CONNECTED:
+            self._set_connection_state(CONNECTION_CONNECTED)
+        if not self._rx_event.is_set():
+            self._rx_event.set()
+
+        # Most frames repeat the previous one byte for byte; nothing to parse then.
+        if self._last_payload.get(src_ip) == data:
+            self.rx_deduplicated += 1
+            if self.field_profiler is not None:
+                self.field_profiler.repeat()
+            return
+        self._last_payload[src_ip] = data
+
+        self.rx_parsed += 1
+        started = time.perf_counter()
         self._handle_telemetry(data)
+        self.metrics.parse_time_us.record((time.perf_counter() - started) * 1e6)
+
+    def _source_allowed(self, src_ip: str) -> bool:
+        """
+        Only the routing host's datagrams are ours. Telemetry from another
+        address is learned by SaunaTransport, which pins it before delivering.
+        """
+        return src_ip == self.routing_host
+
+    def pin_telemetry_host(self, src_ip: str, pkt_guid: str | None = None) -> None:
+        """Accept telemetry from src_ip from now on (relaxed mode)."""
+        self.telemetry_host = src_ip
+        _LOGGER.warning(
+            "Tylo Sauna: telemetry received from %s (configured host=%s). "
+            "Pinning telemetry_host=%s (guid_hint=%s).",
+            src_ip, self.host, src_ip, pkt_guid or "n/a"
+        )
+        if self._udp is not None:
+            self._udp.reindex()
+
+    def set_host(self, host: str) -> None:
+        """
+        Follow the sauna to a new address (e.g. after a DHCP lease change).
+
+        State, entities and tasks are kept; the learned telemetry host and the
+        per-sender caches are reset and a HELLO/INIT is sent to the new address
+        right away instead of waiting for the keepalive to notice the silence.
+        """
+        if host == self.host:
+            return
+        _LOGGER.warning(
+            "Tylo Sauna: %s moved from %s to %s (guid=%s)",
+            self.name, self.host, host, self.guid,
+        )
+        self.host = host
+        self.telemetry_host = None
+        self._last_payload.clear()
+        if self._udp is not None:
+            self._udp.reindex()
+        if self._transport is not None:
+            self._send(HELLO_PAYLOAD, "HELLO (new host)")
+            self._send(INIT_SHORT, "INIT_SHORT")
 
     # === Telemetry parsing ===
 
     def _handle_telemetry(self, data: bytes) -> None:
-        changed = False
-
-        light = self._parse_light(data)
-        if light is not None and light != self.light:
-            self.light = light
-            changed = True
-
-        stop_cfg = self._parse_stop_cfg(data)
-        if stop_cfg is not None and stop_cfg != self.stop_cfg_min:
-            self.stop_cfg_min = stop_cfg
-            changed = True
+        fields = decode_records(data)
+        if self.field_profiler is not None:
+            self.field_profiler.record(fields)
+        if not fields:
+            self.metrics.dropped += 1
+            return
 
-        stop_rem = self._parse_stop_rem(data)
-        if stop_rem is not None and stop_rem != self.stop_rem_min:
-            self.stop_rem_min = stop_rem
-            changed = True
+        changed: set[str] = set()
+        if self.stale:
+            self.stale = False
+            changed.add(STATE_STALE)
+
+        # Scaling and flag validation come from the field specs (protocol.py)
+        raw = fields.get(FIELD_LIGHT)
+        if raw is not None:
+            light = LIGHT.to_state(raw)
+            if light is not None and light != self.light:
+                self.light = light
+                changed.add(STATE_LIGHT)
+
+        raw = fields.get(FIELD_STOP_CFG)
+        if raw is not None:
+            stop_cfg = STOP_CFG.to_state(raw)
+            if stop_cfg != self.stop_cfg_min:
+                self.stop_cfg_min = stop_cfg
+                changed.add(STATE_STOP_CFG)
+
+        raw = fields.get(FIELD_STOP_REM)
+        if raw is not None:
+            stop_rem = STOP_REM.to_state(raw)
+            if stop_rem != self.stop_rem_min:
+                self.stop_rem_min = stop_rem
+                changed.add(STATE_STOP_REM)
 
         new_heat = None
         if self.stop_rem_min is not None:
             new_heat = self.stop_rem_min > 0
         if new_heat is not None and new_heat != self.heat:
             self.heat = new_heat
-            changed = True
-
-        t_set_c = self._parse_temp_set(data)
-        if t_set_c is not None and t_set_c != self.t_set_c:
-            self.t_set_c = t_set_c
-            changed = True
-
-        t_cur_c = self._parse_temp_cur(data)
-        if t_cur_c is not None and t_cur_c != self.t_cur_c:
-            self.t_cur_c = t_cur_c
-            changed = True
-
-        if changed:
-            telemetry_src = self.telemetry_host or self.host
+            changed.add(STATE_HEAT)
+            # Heating and cooling curves do not mix; start a new fit
+            self.heatup.reset()
+
+        raw = fields.get(FIELD_T_SET)
+        if raw is not None:
+            t_set_c = T_SET.to_state(raw)
+            if t_set_c != self.t_set_c:
+                self.t_set_c = t_set_c
+                changed.add(STATE_T_SET)
+
+        raw = fields.get(FIELD_T_CUR)
+        if raw is not None:
+            t_cur_c = T_CUR.to_state(raw)
+            # The heat-up fit gets the full resolution
+            self.heatup.update(self.last_rx_monotonic, t_cur_c)
+            if self.temperature_precision:
+                step = self.temperature_precision
+                t_cur_c = round(round(t_cur_c / step) * step, 2)
+            if t_cur_c != self.t_cur_c:
+                self.t_cur_c = t_cur_c
+                changed.add(STATE_T_CUR)
+            self._update_heatup(changed)
+        elif STATE_HEAT in changed or STATE_T_SET in changed:
+            self._update_heatup(changed)
+
+        if changed and self._commands:
+            self._confirm_commands(changed)
+
+        if changed and self.time_to_first_state is None and self._started_monotonic is not None:
+            self.time_to_first_state = self.last_rx_monotonic - self._started_monotonic
             _LOGGER.info(
-                "Tylo Sauna state: LIGHT=%s, HEAT=%s, Tset=%s°C, Tcur=%s°C, StopCfg=%s, StopRem=%s "
-                "(telemetry_host=%s, rx=%d, tx=%d)",
-                self.light,
-                self.heat,
-                f"{self.t_set_c:.1f}" if self.t_set_c is not None else "?",
-                f"{self.t_cur_c:.1f}" if self.t_cur_c is not None else "?",
-                self.stop_cfg_min if self.stop_cfg_min is not None else "?",
-                self.stop_rem_min if self.stop_rem_min is not None else "?",
-                telemetry_src,
-                self.rx_packets,
-                self.tx_packets,
+                "Tylo Sauna: first state from %s after %.3fs",
+                self.host, self.time_to_first_state,
             )
-            self._notify_listeners()
 
-    def _parse_light(self, data: bytes) -> bool | None:
-        pattern = bytes.fromhex("da7d04080a10")
-        idx = data.find(pattern)
-        if idx == -1 or idx + len(pattern) >= len(data):
-            return None
-        val = data[idx + len(pattern)]
-        if val == 1:
-            return True
-        if val == 0:
-            return False
-        return None
-
-    def _parse_stop_cfg(self, data: bytes) -> int | None:
-        for prefix_hex in ("d27d05081110", "d27d04081110"):
-            val = _parse_varint_after(data, prefix_hex)
-            if val is not None:
-                return val
-        return None
-
-    def _parse_stop_rem(self, data: bytes) -> int | None:
-        for prefix_hex in ("d27d05081610", "d27d04081610"):
-            val = _parse_varint_after(data, prefix_hex)
-            if val is not None:
-                return val
-        return None
-
-    def _parse_temp_set(self, data: bytes) -> float | None:
-        raw = _parse_varint_after(data, "d27d05080a10")
-        if raw is None:
-            return None
-        return raw / 9.0
+        if not changed.isdisjoint(HISTORY_FIELDS):
+            self.history.append(
+                self.last_rx_monotonic,
+                self.t_cur_c,
+                self.t_set_c,
+                self.heat,
+                self.stop_rem_min,
+            )
 
-    def _parse_temp_cur(self, data: bytes) -> float | None:
-        raw = _parse_varint_after(data, "d27d05080c10")
-        if raw is None:
-            return None
-        return raw / 9.0
+        if changed:
+            # Steady-state trace; only built when debug logging is enabled
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.debug(
+                    "Tylo Sauna state: LIGHT=%s, HEAT=%s, Tset=%s°C, Tcur=%s°C, StopCfg=%s, "
+                    "StopRem=%s (telemetry_host=%s, rx=%d, tx=%d)",
+                    self.light,
+                    self.heat,
+                    _fmt_temp(self.t_set_c),
+                    _fmt_temp(self.t_cur_c),
+                    self.stop_cfg_min if self.stop_cfg_min is not None else "?",
+                    self.stop_rem_min if self.stop_rem_min is not None else "?",
+                    self.telemetry_host or self.host,
+                    self.rx_packets,
+                    self.tx_packets,
+                )
+            self._notify_listeners(changed, self.last_rx_monotonic)
+
+    def _update_heatup(self, changed: set[str]) -> None:
+        """
+        Refresh rate of rise and ETA from the heat-up fit.
+
+        The fit moves a little with every frame, so a value is only published
+        once it is a full step away from the published one; fit noise around
+        a rounding boundary does not cause state writes.
+        """
+        rate = self.heatup.rate
+        if _moved(rate, self.heat_rate_c_min, HEATUP_RATE_STEP):
+            self.heat_rate_c_min = (
+                round(round(rate / HEATUP_RATE_STEP) * HEATUP_RATE_STEP, 1)
+                if rate is not None
+                else None
+            )
+            changed.add(STATE_HEAT_RATE)
+
+        eta = None
+        if self.heat and self.t_cur_c is not None and self.t_set_c is not None:
+            eta = self.heatup.eta(self.t_cur_c, self.t_set_c)
+        if eta == 0.0 and self.heatup_eta_min != 0:
+            # Reached: publish right away
+            self.heatup_eta_min = 0
+            changed.add(STATE_HEATUP_ETA)
+        elif _moved(eta, self.heatup_eta_min, HEATUP_ETA_STEP):
+            self.heatup_eta_min = math.ceil(eta) if eta is not None else None
+            changed.add(STATE_HEATUP_ETA)
 
     # === API for entities ===
 
-    def register_callback(self, cb) -> None:
-        self._callbacks.append(cb)
+    def register_callback(
+        self,
+        cb: Callable[[set[str]], None],
+        fields: Iterable[str] | None = None,
+    ) -> Callable[[], None]:
+        """
+        Register an entity callback; returns a function that unregisters it.
+
+        The callback is called with the set of changed state fields (STATE_*),
+        but only if that set intersects the given fields. Without fields the
+        callback is called on every change.
+        """
+        entry = (cb, frozenset(fields) if fields is not None else None)
+        self._callbacks.append(entry)
+
+        def _unregister() -> None:
+            if entry in self._callbacks:
+                self._callbacks.remove(entry)
+
+        return _unregister
+
+    def _notify_listeners(self, changed: set[str], rx_time: float | None = None) -> None:
+        """
+        Notify entities about changed fields.
+
+        With a flush window, changes are collected and delivered once per
+        window; entities read the controller when writing state, so they
+        always publish the latest values. rx_time is the loop time of the
+        datagram that caused the change, for the write delay histogram.
+        """
+        if self.flush_window <= 0:
+            self._dispatch(changed, rx_time)
+            return
+        self._pending_changes |= changed
+        if rx_time is not None and self._pending_rx_time is None:
+            self._pending_rx_time = rx_time
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.flush_window, self._flush_pending_changes
+            )
+
+    def _flush_pending_changes(self) -> None:
+        self._flush_handle = None
+        changed, self._pending_changes = self._pending_changes, set()
+        rx_time, self._pending_rx_time = self._pending_rx_time, None
+        if changed:
+            self._dispatch(changed, rx_time)
 
-    def _notify_listeners(self) -> None:
-        for cb in list(self._callbacks):
+    def _dispatch(self, changed: set[str], rx_time: float | None = None) -> None:
+        for cb, fields in list(self._callbacks):
+            if fields is not None and fields.isdisjoint(changed):
+                continue
             try:
-                cb()
+                cb(changed)
             except Exception as exc:  # noqa: BLE001
                 _LOGGER.exception("Tylo Sauna callback error: %s", exc)
+        if rx_time is not None:
+            delay = asyncio.get_running_loop().time() - rx_time
+            self.metrics.write_delay_ms.record(delay * 1000.0)
 
     # --- Commands ---
 
     def light_on(self) -> None:
-        self._send(LIGHT_ON_PAYLOAD, "LIGHT ON")
+        self._submit(_Command(CMD_LIGHT, ((LIGHT_ON_PAYLOAD, "LIGHT ON"),), STATE_LIGHT, True))
 
     def light_off(self) -> None:
-        self._send(LIGHT_OFF_PAYLOAD, "LIGHT OFF")
+        self._submit(_Command(CMD_LIGHT, ((LIGHT_OFF_PAYLOAD, "LIGHT OFF"),), STATE_LIGHT, False))
 
     def heat_on(self) -> None:
-        self._send(HEAT_ON_PAYLOAD, "HEAT ON")
-        self._send(HEAT_AUX_PAYLOAD, "HEAT AUX")
+        self._submit(
+            _Command(
+                CMD_HEAT,
+                ((HEAT_ON_PAYLOAD, "HEAT ON"), (HEAT_AUX_PAYLOAD, "HEAT AUX")),
+                STATE_HEAT,
+                True,
+            )
+        )
 
     def heat_off(self) -> None:
-        self._send(HEAT_OFF_PAYLOAD, "HEAT OFF")
-        self._send(HEAT_AUX_PAYLOAD, "HEAT AUX")
+        self._submit(
+            _Command(
+                CMD_HEAT,
+                ((HEAT_OFF_PAYLOAD, "HEAT OFF"), (HEAT_AUX_PAYLOAD, "HEAT AUX")),
+                STATE_HEAT,
+                False,
+            )
+        )
 
     async def async_set_temperature(self, temp_c: float) -> None:
-        raw = int(round(temp_c * 9.0))
-        prefix = bytes.fromhex("d24105080a10")
-        payload = prefix + _encode_varint(raw)
-        self._send(payload, f"SETTEMP {temp_c:.1f}°C")
+        raw = temperature_to_raw(temp_c)
+        payload = encode_set_temperature(raw)
+        self._submit(
+            _Command(
+                CMD_SET_TEMPERATURE,
+                ((payload, f"SETTEMP {temp_c:.1f}°C"),),
+                STATE_T_SET,
+                T_SET.to_state(raw),
+                debounce=SETPOINT_DEBOUNCE,
+            )
+        )
 
     async def async_set_stop_after(self, minutes: int) -> None:
         m = int(minutes)
-        var = _encode_varint(m)
-        p1 = bytes.fromhex("d24105080e10") + var
-        p2 = bytes.fromhex("d23e020801")
-        self._send(p1, f"SETSTOP {m} min (cfg)")
-        await asyncio.sleep(0.02)
-        self._send(p2, "SETSTOP aux")
+        payload = encode_set_stop_after(m)
+        self._submit(
+            _Command(
+                CMD_SET_STOP_AFTER,
+                ((payload, f"SETSTOP {m} min (cfg)"), (SETSTOP_AUX_PAYLOAD, "SETSTOP aux")),
+                STATE_STOP_CFG,
+                m,
+                gap=SETSTOP_AUX_DELAY,
+                debounce=SETPOINT_DEBOUNCE,
+            )
+        )
+
+    def _submit(self, cmd: _Command) -> None:
+        """
+        Queue a command; it replaces a pending command of the same kind.
+
+        Last write wins: a replaced command that is still in its debounce
+        window never goes on the wire, one that is awaiting confirmation
+        stops retrying.
+        """
+        previous = self._command_tasks.pop(cmd.kind, None)
+        if previous is not None:
+            prev_cmd, prev_task = previous
+            if not prev_task.done():
+                prev_task.cancel()
+                stats = self.command_stats.setdefault(cmd.kind, CommandStats())
+                if prev_cmd.transmitted:
+                    stats.sent += 1
+                    stats.replaced += 1
+                else:
+                    stats.collapsed += 1
+        task = self._hass.async_create_background_task(
+            self._async_run_command(cmd), name=f"tylo_sauna {self.host} {cmd.kind}"
+        )
+        self._command_tasks[cmd.kind] = (cmd, task)
+
+    async def _async_run_command(self, cmd: _Command) -> None:
+        loop = asyncio.get_running_loop()
+        stats = self.command_stats.setdefault(cmd.kind, CommandStats())
+
+        if cmd.debounce:
+            await asyncio.sleep(cmd.debounce)
+
+        if getattr(self, cmd.state_field) == cmd.expected:
+            # Nothing telemetry could confirm; send once like the app does.
+            await self._async_transmit(cmd)
+            stats.sent += 1
+            return
+
+        self._commands[cmd.kind] = cmd
+        try:
+            started = loop.time()
+            timeout = COMMAND_TIMEOUT
+            for attempt in range(COMMAND_RETRIES + 1):
+                if attempt:
+                    stats.retries += 1
+                    _LOGGER.debug(
+                        "Tylo Sauna: %s not confirmed, resending (attempt %d)",
+                        cmd.kind, attempt + 1,
+                    )
+                await self._async_transmit(cmd)
+                try:
+                    await asyncio.wait_for(cmd.confirmed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    timeout *= COMMAND_BACKOFF
+                    continue
+                if cmd.superseded:
+                    # Changed elsewhere after we sent; resending would overwrite it
+                    stats.sent += 1
+                    stats.superseded += 1
+                    _LOGGER.debug(
+                        "Tylo Sauna: %s superseded by %s=%s, not resending",
+                        cmd.kind, cmd.state_field, getattr(self, cmd.state_field),
+                    )
+                    return
+                latency = loop.time() - started
+                stats.sent += 1
+                stats.confirmed += 1
+                stats.last_latency = latency
+                stats.total_latency += latency
+                self.metrics.record_command_rtt(cmd.kind, latency)
+                return
+
+            stats.sent += 1
+            stats.failed += 1
+            _LOGGER.warning(
+                "Tylo Sauna: %s was not confirmed by telemetry after %d attempts",
+                cmd.kind, COMMAND_RETRIES + 1,
+            )
+        finally:
+            if self._commands.get(cmd.kind) is cmd:
+                del self._commands[cmd.kind]
+
+    async def _async_transmit(self, cmd: _Command) -> None:
+        cmd.transmitted = True
+        for i, (payload, desc) in enumerate(cmd.packets):
+            if i and cmd.gap:
+                await asyncio.sleep(cmd.gap)
+            self._send(payload, desc)
+
+    def _confirm_commands(self, changed: set[str]) -> None:
+        """
+        Settle the commands whose field changed: confirmed when it reached the
+        expected value, superseded when it changed to anything else.
+        """
+        for cmd in self._commands.values():
+            if cmd.state_field in changed:
+                cmd.superseded = getattr(self, cmd.state_field) != cmd.expected
+                cmd.confirmed.set()
@@ -0,0 +1,26 @@
+"""Diagnostics download for Tylo Sauna config entries."""
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import DATA_TRANSPORT, DOMAIN
+
+TO_REDACT = {"guid"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return controller state, counters and hot-path metrics."""
+    domain_data = hass.data.get(DOMAIN, {})
+    data = domain_data.get(entry.entry_id)
+    transport = domain_data.get(DATA_TRANSPORT)
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "options": dict(entry.options),
+        "controller": data["controller"].diagnostics() if data else None,
+        "transport": transport.diagnostics() if transport else None,
+    }
@@ -0,0 +1,133 @@
+"""Passive discovery of Tylo saunas from their UDP broadcasts."""
+import asyncio
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from .protocol import DISCOVERY_PORTS, extract_guid
+
+_LOGGER = logging.getLogger(__name__)
+
+DISCOVERY_TTL = 300.0  # seconds a sauna stays cached after its last broadcast
+DISCOVERY_QUIET_PERIOD = 1.0  # seconds without new saunas before a wait returns early
+
+
+@dataclass
+class DiscoveredSauna:
+    host: str
+    guid: str
+    last_seen: float = 0.0  # loop time of the last broadcast
+
+
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Feeds broadcasts received on one discovery port to the listener."""
+
+    def __init__(self, listener: "DiscoveryListener") -> None:
+        self._listener = listener
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self._listener.datagram_received(data, addr)
+
+
+class DiscoveryListener:
+    """
+    Background listener on the discovery ports.
+
+    Keeps a TTL-bounded cache of the saunas that broadcast recently, so the
+    config flow can show them without listening first.
+    """
+
+    def __init__(self, ttl: float = DISCOVERY_TTL) -> None:
+        self.ttl = ttl
+        self._cache: dict[str, DiscoveredSauna] = {}
+        self._transports: list[asyncio.DatagramTransport] = []
+        self._found = asyncio.Event()  # set when a new sauna (or new address) appears
+        self._callbacks: list[Callable[[DiscoveredSauna], None]] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._transports)
+
+    async def async_start(self) -> bool:
+        """Bind the discovery ports; False if none could be opened."""
+        loop = asyncio.get_running_loop()
+        for port in DISCOVERY_PORTS:
+            try:
+                transport, _protocol = await loop.create_datagram_endpoint(
+                    lambda: _DiscoveryProtocol(self),
+                    local_addr=("0.0.0.0", port),
+                )
+            except OSError as exc:
+                _LOGGER.debug("Tylo Sauna discovery: cannot bind %s: %s", port, exc)
+                continue
+            self._transports.append(transport)
+            _LOGGER.debug("Tylo Sauna discovery: listening on UDP %s", port)
+        return self.running
+
+    def stop(self) -> None:
+        for transport in self._transports:
+            transport.close()
+        self._transports.clear()
+
+    def register_callback(
+        self, cb: Callable[[DiscoveredSauna], None]
+    ) -> Callable[[], None]:
+        """
+        Call cb for every new sauna and every sauna seen at a new address;
+        returns a function that unregisters it.
+        """
+        self._callbacks.append(cb)
+
+        def _unregister() -> None:
+            if cb in self._callbacks:
+                self._callbacks.remove(cb)
+
+        return _unregister
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        host = addr[0]
+        guid = extract_guid(data)
+        if guid is None:
+            return
+        now = asyncio.get_running_loop().time()
+        sauna = self._cache.get(guid)
+        if sauna is not None and sauna.host == host:
+            sauna.last_seen = now
+            return
+        _LOGGER.debug("Tylo Sauna discovery: found %s at %s", guid, host)
+        sauna = self._cache[guid] = DiscoveredSauna(host=host, guid=guid, last_seen=now)
+        self._found.set()
+        for cb in list(self._callbacks):
+            try:
+                cb(sauna)
+            except Exception as exc:  # noqa: BLE001
+                _LOGGER.exception("Tylo Sauna discovery callback error: %s", exc)
+
+    def saunas(self) -> list[DiscoveredSauna]:
+        """Saunas seen within the TTL; expired entries are dropped."""
+        cutoff = asyncio.get_running_loop().time() - self.ttl
+        for guid in [g for g, s in self._cache.items() if s.last_seen < cutoff]:
+            del self._cache[guid]
+        return list(self._cache.values())
+
+    async def async_wait(
+        self, timeout: float, quiet_period: float = DISCOVERY_QUIET_PERIOD
+    ) -> list[DiscoveredSauna]:
+        """
+        Wait for broadcasts: return once no new sauna appeared for
+        quiet_period after the first one, or after timeout.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while (remaining := deadline - loop.time()) > 0:
+            found_any = bool(self.saunas())
+            self._found.clear()
+            try:
+                await asyncio.wait_for(
+                    self._found.wait(),
+                    min(quiet_period, remaining) if found_any else remaining,
+                )
+            except asyncio.TimeoutError:
+                if found_any:
+                    break
+        return self.saunas()
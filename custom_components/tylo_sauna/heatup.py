@@ -0,0 +1,73 @@
+"""Heat-up estimate: rate of rise and time until the setpoint is reached."""
+import math
+
+HEATUP_HALF_LIFE = 300.0  # seconds; a sample's weight halves every 5 minutes
+HEATUP_MIN_SAMPLES = 3    # samples since the last reset before a rate is reported
+HEATUP_MIN_RATE = 0.05    # °C/min; slower than this gives no ETA
+HEATUP_RATE_STEP = 0.1    # °C/min; published rate resolution and minimum change
+HEATUP_ETA_STEP = 1.0     # minutes; minimum ETA change before it is published
+
+
+class HeatupEstimator:
+    """
+    Exponentially weighted linear fit of temperature over time.
+
+    Only the weighted sums of the least-squares fit are kept, so an update is
+    O(1) in time and memory. Times are stored relative to the latest sample:
+    on every update the sums are decayed and shifted to the new origin, which
+    keeps them small however long a session runs.
+    """
+
+    def __init__(self, half_life: float = HEATUP_HALF_LIFE) -> None:
+        self._tau = half_life / math.log(2)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all samples (heating switched on or off)."""
+        self.samples = 0
+        self._last_ts: float | None = None
+        # Weighted sums of 1, t, y, t*t, t*y with t relative to _last_ts
+        self._s0 = self._st = self._sy = self._stt = self._sty = 0.0
+
+    def update(self, ts: float, temp_c: float) -> None:
+        """Add a temperature sample taken at monotonic time ts (seconds)."""
+        if self._last_ts is not None:
+            dt = ts - self._last_ts
+            if dt < 0:
+                return
+            decay = math.exp(-dt / self._tau)
+            # Decay, then move the time origin forward by dt
+            s0 = self._s0 * decay
+            st = self._st * decay
+            sy = self._sy * decay
+            stt = self._stt * decay
+            sty = self._sty * decay
+            self._stt = stt - 2 * dt * st + dt * dt * s0
+            self._sty = sty - dt * sy
+            self._st = st - dt * s0
+            self._sy = sy
+            self._s0 = s0
+        self._last_ts = ts
+        # New sample at t = 0
+        self._s0 += 1.0
+        self._sy += temp_c
+        self.samples += 1
+
+    @property
+    def rate(self) -> float | None:
+        """Fitted rate of temperature change in °C per minute."""
+        if self.samples < HEATUP_MIN_SAMPLES:
+            return None
+        denom = self._s0 * self._stt - self._st * self._st
+        if denom <= 1e-9:
+            return None
+        return (self._s0 * self._sty - self._st * self._sy) / denom * 60.0
+
+    def eta(self, temp_c: float, target_c: float) -> float | None:
+        """Minutes until temp_c reaches target_c at the fitted rate."""
+        if temp_c >= target_c:
+            return 0.0
+        rate = self.rate
+        if rate is None or rate < HEATUP_MIN_RATE:
+            return None
+        return (target_c - temp_c) / rate
@@ -0,0 +1,117 @@
+"""Short-term telemetry history kept in memory, independent of the recorder."""
+import math
+from array import array
+from typing import Any
+
+HISTORY_CAPACITY = 8192  # samples; state changes, so several hours of sessions
+
+_NO_STOP = -1
+_NO_HEAT = -1
+
+
+class TelemetryHistory:
+    """
+    Fixed-capacity ring buffer of state samples.
+
+    Samples are stored column-wise in typed arrays (19 bytes per sample):
+    monotonic timestamp (d), current and target temperature (f, NaN when
+    unknown), remaining stop time (h, -1 when unknown) and heat (b, -1 when
+    unknown). The oldest sample is overwritten once the buffer is full.
+    """
+
+    def __init__(self, capacity: int = HISTORY_CAPACITY) -> None:
+        self.capacity = capacity
+        self._ts = array("d", bytes(8 * capacity))
+        self._t_cur = array("f", bytes(4 * capacity))
+        self._t_set = array("f", bytes(4 * capacity))
+        self._stop_rem = array("h", bytes(2 * capacity))
+        self._heat = array("b", bytes(capacity))
+        self._next = 0  # slot the next sample goes to
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self,
+        ts: float,
+        t_cur_c: float | None,
+        t_set_c: float | None,
+        heat: bool | None,
+        stop_rem_min: int | None,
+    ) -> None:
+        i = self._next
+        self._ts[i] = ts
+        self._t_cur[i] = t_cur_c if t_cur_c is not None else math.nan
+        self._t_set[i] = t_set_c if t_set_c is not None else math.nan
+        self._stop_rem[i] = stop_rem_min if stop_rem_min is not None else _NO_STOP
+        self._heat[i] = int(heat) if heat is not None else _NO_HEAT
+        self._next = (i + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def _slot(self, n: int) -> int:
+        """Physical slot of the n-th oldest sample."""
+        return (self._next - self._size + n) % self.capacity
+
+    def _first_at_or_after(self, ts: float) -> int:
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ts[self._slot(mid)] < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def window(self, start: float, end: float, points: int) -> list[dict[str, Any]]:
+        """
+        Samples between start and end (monotonic), downsampled to at most
+        `points` buckets of equal duration.
+
+        Per bucket the current temperature is averaged; target temperature,
+        heat and remaining time are the last value seen. Buckets are stamped
+        with their start time; empty ones are skipped.
+        """
+        if points < 1 or end <= start or not self._size:
+            return []
+        width = (end - start) / points
+        out: list[dict[str, Any]] = []
+        bucket = -1
+        cur_sum = 0.0
+        cur_n = 0
+        last = 0
+
+        def _flush() -> None:
+            t_cur = cur_sum / cur_n if cur_n else None
+            t_set = self._t_set[last]
+            out.append(
+                {
+                    "ts": start + bucket * width,
+                    "t_cur_c": round(t_cur, 2) if t_cur is not None else None,
+                    "t_set_c": round(t_set, 2) if not math.isnan(t_set) else None,
+                    "heat": bool(self._heat[last]) if self._heat[last] != _NO_HEAT else None,
+                    "stop_rem_min": (
+                        self._stop_rem[last] if self._stop_rem[last] != _NO_STOP else None
+                    ),
+                }
+            )
+
+        for n in range(self._first_at_or_after(start), self._size):
+            i = self._slot(n)
+            ts = self._ts[i]
+            if ts > end:
+                break
+            b = min(int((ts - start) / width), points - 1)
+            if b != bucket:
+                if bucket >= 0:
+                    _flush()
+                bucket, cur_sum, cur_n = b, 0.0, 0
+            t_cur = self._t_cur[i]
+            if not math.isnan(t_cur):
+                cur_sum += t_cur
+                cur_n += 1
+            last = i
+        if bucket >= 0:
+            _flush()
+        return out
@@ -3,10 +3,11 @@ from typing import Any
 
 from homeassistant.components.light import LightEntity, ColorMode
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 
 from . import DOMAIN
+from .controller import STATE_LIGHT
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,18 +34,19 @@ class TyloSaunaLight(LightEntity):
 
     _attr_supported_color_modes = {ColorMode.ONOFF}
     _attr_color_mode = ColorMode.ONOFF
+    _attr_should_poll = False
 
     def __init__(self, controller, entry_id: str) -> None:
         self._controller = controller
         self._entry_id = entry_id
         self._attr_name = f"{controller.name} light"
-        self._attr_unique_id = f"tylo_sauna_{controller.host}_light"
+        self._attr_unique_id = f"tylo_sauna_{controller.unique_host}_light"
 
     @property
     def device_info(self) -> DeviceInfo:
         """Device information shared between climate, light and number entities."""
         return DeviceInfo(
-            identifiers={(DOMAIN, self._controller.host)},
+            identifiers={(DOMAIN, self._controller.unique_host)},
             name=self._controller.name,
             manufacturer="Tylo",
             model="Elite",
@@ -52,7 +54,13 @@ class TyloSaunaLight(LightEntity):
 
     async def async_added_to_hass(self) -> None:
         """Register for state updates from the controller."""
-        self._controller.register_callback(self.async_write_ha_state)
+        self.async_on_remove(
+            self._controller.register_callback(self._handle_controller_update, (STATE_LIGHT,))
+        )
+
+    @callback
+    def _handle_controller_update(self, changed: set[str]) -> None:
+        self.async_write_ha_state()
 
     @property
     def is_on(self) -> bool | None:
@@ -0,0 +1,63 @@
+"""Rate-limited warnings for the telemetry hot path."""
+import logging
+import time
+from typing import Any
+
+LOG_REPEAT_INTERVAL = 900.0  # seconds before the same (source, reason) warning is logged again
+LOG_MAX_KEYS = 256  # (source, reason) pairs remembered
+
+
+class RateLimitedLogger:
+    """
+    Logs a warning per (source, reason) at most once per interval.
+
+    Repeats within the interval are only counted; the next warning that gets
+    through reports how many were suppressed. Arguments are passed to the
+    logger unformatted, so nothing is formatted for suppressed or filtered
+    records.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        interval: float = LOG_REPEAT_INTERVAL,
+        max_keys: int = LOG_MAX_KEYS,
+    ) -> None:
+        self._logger = logger
+        self.interval = interval
+        self._max_keys = max_keys
+        # (source, reason) -> [time last logged, repeats suppressed since]
+        self._seen: dict[tuple[str, str], list] = {}
+        self.suppressed: dict[str, int] = {}  # per reason, since start
+
+    def warning(self, source: str, reason: str, msg: str, *args: Any) -> None:
+        now = time.monotonic()
+        key = (source, reason)
+        seen = self._seen.get(key)
+        if seen is not None and now - seen[0] < self.interval:
+            seen[1] += 1
+            self.suppressed[reason] = self.suppressed.get(reason, 0) + 1
+            return
+
+        repeats = seen[1] if seen is not None else 0
+        if seen is None and len(self._seen) >= self._max_keys:
+            del self._seen[next(iter(self._seen))]
+        self._seen[key] = [now, 0]
+
+        if repeats:
+            self._logger.warning(
+                msg + " (%d similar message(s) suppressed in the last %.0f s)",
+                *args, repeats, self.interval,
+            )
+        else:
+            self._logger.warning(msg, *args)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "suppressed": dict(self.suppressed),
+            "suppressed_pending": {
+                f"{source}/{reason}": repeats
+                for (source, reason), (_ts, repeats) in self._seen.items()
+                if repeats
+            },
+        }
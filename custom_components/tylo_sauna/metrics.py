@@ -0,0 +1,170 @@
+"""Lightweight runtime metrics for the telemetry hot path."""
+from bisect import bisect_left
+from typing import Any
+
+# Bucket upper bounds
+PARSE_TIME_BOUNDS_US = (2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+WRITE_DELAY_BOUNDS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+COMMAND_RTT_BOUNDS_MS = (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram.
+
+    Recording is a bisect over a handful of bounds plus a few additions, so it
+    is cheap enough to run for every datagram.
+    """
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket: above the last bound
+        self.count = 0
+        self.total = 0.0
+        self.min: float | None = None
+        self.max: float | None = None
+
+    def record(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def percentile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th percentile (0..100)."""
+        if not self.count:
+            return None
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return self.bounds[i] if i < len(self.bounds) else self.max
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": _round(self.mean),
+            "min": _round(self.min),
+            "max": _round(self.max),
+            "p50": _round(self.percentile(50)),
+            "p95": _round(self.percentile(95)),
+            "buckets": {
+                (f"<={b}" if i < len(self.bounds) else f">{self.bounds[-1]}"): n
+                for i, (b, n) in enumerate(zip(self.bounds + (None,), self.counts))
+            },
+        }
+
+
+def _round(value: float | None) -> float | None:
+    return round(value, 3) if value is not None else None
+
+
+class ControllerMetrics:
+    """Hot-path metrics of one SaunaController."""
+
+    def __init__(self) -> None:
+        self.parse_time_us = Histogram(PARSE_TIME_BOUNDS_US)
+        self.write_delay_ms = Histogram(WRITE_DELAY_BOUNDS_MS)
+        self.command_rtt_ms: dict[str, Histogram] = {}
+
+        self.dropped = 0        # accepted datagrams without any telemetry record
+        self.filtered = 0       # datagrams from a sender that is not ours
+        self.guid_mismatch = 0  # relaxed mode: telemetry carrying another GUID
+
+    def record_command_rtt(self, kind: str, seconds: float) -> None:
+        hist = self.command_rtt_ms.get(kind)
+        if hist is None:
+            hist = self.command_rtt_ms[kind] = Histogram(COMMAND_RTT_BOUNDS_MS)
+        hist.record(seconds * 1000.0)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "parse_time_us": self.parse_time_us.as_dict(),
+            "write_delay_ms": self.write_delay_ms.as_dict(),
+            "command_rtt_ms": {k: h.as_dict() for k, h in self.command_rtt_ms.items()},
+            "dropped": self.dropped,
+            "filtered": self.filtered,
+            "guid_mismatch": self.guid_mismatch,
+        }
+
+
+# Field profiler: at most this many distinct field ids are tracked
+MAX_PROFILED_FIELDS = 128
+
+
+class FieldProfiler:
+    """
+    Constant-memory statistics for every telemetry record, known or not.
+
+    Per field key it keeps [count, min, max, last, changes]; once
+    MAX_PROFILED_FIELDS keys are tracked, records of new keys are only
+    counted in `untracked`. Counts include byte-identical repeats of the
+    previous frame, which the controller reports through repeat() without
+    decoding them again.
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[int, list[int]] = {}
+        self._last_frame: list[list[int]] = []  # stats of the fields of the last frame
+        self._last_untracked = 0
+        self.frames = 0
+        self.untracked = 0
+
+    def record(self, fields: dict[int, int]) -> None:
+        self.frames += 1
+        stats = self._stats
+        last_frame = self._last_frame = []
+        self._last_untracked = 0
+        for key, value in fields.items():
+            s = stats.get(key)
+            if s is None:
+                if len(stats) >= MAX_PROFILED_FIELDS:
+                    self.untracked += 1
+                    self._last_untracked += 1
+                    continue
+                s = stats[key] = [1, value, value, value, 0]
+                last_frame.append(s)
+                continue
+            last_frame.append(s)
+            s[0] += 1
+            if value < s[1]:
+                s[1] = value
+            elif value > s[2]:
+                s[2] = value
+            if value != s[3]:
+                s[3] = value
+                s[4] += 1
+
+    def repeat(self) -> None:
+        """The last recorded frame was received again, byte for byte."""
+        self.frames += 1
+        self.untracked += self._last_untracked
+        for s in self._last_frame:
+            s[0] += 1
+
+    def as_dict(self, names: dict[int, str] | None = None) -> dict[str, Any]:
+        """Statistics keyed "<record kind hex>:<field id>", e.g. "d27d:12"."""
+        names = names or {}
+        fields = {}
+        for key in sorted(self._stats):
+            count, vmin, vmax, last, changes = self._stats[key]
+            entry = {
+                "count": count,
+                "min": vmin,
+                "max": vmax,
+                "last": last,
+                "changes": changes,
+            }
+            if key in names:
+                entry["name"] = names[key]
+            fields[f"{key >> 16:02x}7d:{key & 0xFFFF}"] = entry
+        return {"frames": self.frames, "untracked": self.untracked, "fields": fields}
@@ -3,10 +3,11 @@ from typing import Any
 
 from homeassistant.components.number import NumberEntity, NumberMode
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 
 from . import DOMAIN
+from .controller import STATE_STOP_CFG
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,18 +37,19 @@ class TyloSaunaStopTime(NumberEntity):
     _attr_native_step = 1
     _attr_mode = NumberMode.SLIDER
     _attr_native_unit_of_measurement = "min"
+    _attr_should_poll = False
 
     def __init__(self, controller, entry_id: str) -> None:
         self._controller = controller
         self._entry_id = entry_id
         self._attr_name = f"{controller.name} stop time"
-        self._attr_unique_id = f"tylo_sauna_{controller.host}_stop_time"
+        self._attr_unique_id = f"tylo_sauna_{controller.unique_host}_stop_time"
 
     @property
     def device_info(self) -> DeviceInfo:
         """Device information shared between climate, light and number entities."""
         return DeviceInfo(
-            identifiers={(DOMAIN, self._controller.host)},
+            identifiers={(DOMAIN, self._controller.unique_host)},
             name=self._controller.name,
             manufacturer="Tylo",
             model="Elite",
@@ -55,7 +57,13 @@ class TyloSaunaStopTime(NumberEntity):
 
     async def async_added_to_hass(self) -> None:
         """Register for state updates from the controller."""
-        self._controller.register_callback(self.async_write_ha_state)
+        self.async_on_remove(
+            self._controller.register_callback(self._handle_controller_update, (STATE_STOP_CFG,))
+        )
+
+    @callback
+    def _handle_controller_update(self, changed: set[str]) -> None:
+        self.async_write_ha_state()
 
     @property
     def native_value(self) -> int | None:
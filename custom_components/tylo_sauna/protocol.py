@@ -0,0 +1,279 @@
+"""
+Tylo Elite local UDP protocol (reverse engineered from the official app).
+
+Single implementation of the wire format shared by the controller, the config
+flow and the offline tools. Everything that can be is built at import time, so
+the hot paths never call bytes.fromhex or rebuild record headers.
+
+Telemetry records are protobuf length-delimited fields (tag 2010 -> "d27d",
+tag 2011 -> "da7d") wrapping a small message {1: field id, 2: value}:
+
+    d2 7d <len> 08 <field id> 10 <value varint>
+"""
+import re
+from dataclasses import dataclass
+
+CONTROL_PORT = 42156
+DISCOVERY_PORTS = (54377, 54378)
+
+# Record kinds (first tag byte; the second one is always 0x7d)
+REC_VALUE = 0xD2  # d27d: numeric values
+REC_FLAG = 0xDA   # da7d: on/off flags
+_REC_TAG_HI = 0x7D
+
+TEMP_SCALE = 9.0  # temperatures are sent as °C * 9
+
+
+def decode_varint(data: bytes, start: int):
+    """Simple protobuf varint decoder."""
+    result = 0
+    shift = 0
+    i = start
+    while i < len(data):
+        b = data[i]
+        result |= (b & 0x7F) << shift
+        if not (b & 0x80):
+            return result, i + 1
+        shift += 7
+        i += 1
+    return None, start
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode an integer as protobuf varint."""
+    v = int(value)
+    if v < len(_VARINTS) and v >= 0:
+        return _VARINTS[v]
+    return _encode_varint(v)
+
+
+def _encode_varint(v: int) -> bytes:
+    out = bytearray()
+    if v < 0:
+        raise ValueError("varint only supports non-negative integers")
+    while True:
+        b = v & 0x7F
+        v >>= 7
+        if v:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            break
+    return bytes(out)
+
+
+# Covers every temperature (raw up to 113 °C) and stop time the UI can send
+_VARINTS = tuple(_encode_varint(v) for v in range(1024))
+
+
+# === Telemetry schema ===
+
+
+def field_key(kind: int, field_id: int) -> int:
+    """Key used in the decoded field map for a (record kind, field id) pair."""
+    return (kind << 16) | field_id
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """One known telemetry field."""
+
+    name: str         # SaunaController attribute it maps to
+    kind: int         # REC_VALUE / REC_FLAG
+    field_id: int
+    scale: float = 1.0  # wire value = state value * scale
+    flag: bool = False  # 0/1 on/off value
+
+    @property
+    def key(self) -> int:
+        return field_key(self.kind, self.field_id)
+
+    def to_state(self, raw: int):
+        """Wire value -> state value (None for invalid flag values)."""
+        if self.flag:
+            return bool(raw) if raw <= 1 else None
+        if self.scale != 1.0:
+            return raw / self.scale
+        return raw
+
+    def to_raw(self, value) -> int:
+        """State value -> wire value."""
+        if self.flag:
+            return int(bool(value))
+        return int(round(value * self.scale))
+
+
+T_SET = FieldSpec("t_set_c", REC_VALUE, 0x0A, scale=TEMP_SCALE)
+T_CUR = FieldSpec("t_cur_c", REC_VALUE, 0x0C, scale=TEMP_SCALE)
+STOP_CFG = FieldSpec("stop_cfg_min", REC_VALUE, 0x11)
+STOP_REM = FieldSpec("stop_rem_min", REC_VALUE, 0x16)
+LIGHT = FieldSpec("light", REC_FLAG, 0x0A, flag=True)
+
+TELEMETRY_FIELDS = (T_SET, T_CUR, STOP_CFG, STOP_REM, LIGHT)
+FIELDS_BY_KEY = {f.key: f for f in TELEMETRY_FIELDS}
+
+FIELD_T_SET = T_SET.key
+FIELD_T_CUR = T_CUR.key
+FIELD_STOP_CFG = STOP_CFG.key
+FIELD_STOP_REM = STOP_REM.key
+FIELD_LIGHT = LIGHT.key
+
+
+def decode_records(data: bytes) -> dict[int, int]:
+    """
+    Decode all d27d/da7d records of a datagram in a single pass.
+
+    Returns a map of field key (see field_key) -> varint value. Records may
+    be embedded anywhere in the datagram, so the scan jumps from one 0x7d tag
+    byte to the next and skips over every record it manages to decode.
+    """
+    fields: dict[int, int] = {}
+    n = len(data)
+    find = data.find
+    i = find(_REC_TAG_HI, 1)
+    while i != -1:
+        kind = data[i - 1]
+        nxt = i + 1
+        if (kind == REC_VALUE or kind == REC_FLAG) and i + 4 < n:
+            end = i + 2 + data[i + 1]
+            if end <= n and data[i + 2] == 0x08:
+                field_id = data[i + 3]
+                pos = i + 4
+                if field_id & 0x80:
+                    field_id, pos = decode_varint(data, i + 3)
+                if field_id is not None and pos + 1 < end and data[pos] == 0x10:
+                    value = data[pos + 1]
+                    if value & 0x80:
+                        value, pos = decode_varint(data, pos + 1)
+                    else:
+                        pos += 2
+                    if value is not None and pos == end:
+                        fields[(kind << 16) | field_id] = value
+                        nxt = end
+        i = find(_REC_TAG_HI, nxt)
+    return fields
+
+
+def decode_state(data: bytes) -> dict[str, object]:
+    """Decode the known telemetry fields of a datagram into state values."""
+    state: dict[str, object] = {}
+    for key, raw in decode_records(data).items():
+        spec = FIELDS_BY_KEY.get(key)
+        if spec is not None:
+            value = spec.to_state(raw)
+            if value is not None:
+                state[spec.name] = value
+    return state
+
+
+def encode_record(kind: int, field_id: int, value: int) -> bytes:
+    """Build one telemetry record (used by the simulator and the parser benchmark)."""
+    body = b"\x08" + encode_varint(field_id) + b"\x10" + encode_varint(value)
+    return bytes((kind, _REC_TAG_HI, len(body))) + body
+
+
+def encode_telemetry(state: dict[str, object]) -> bytes:
+    """Build a telemetry frame from state values (inverse of decode_state)."""
+    return b"".join(
+        encode_record(spec.kind, spec.field_id, spec.to_raw(state[spec.name]))
+        for spec in TELEMETRY_FIELDS
+        if state.get(spec.name) is not None
+    )
+
+
+# Record headers that only occur in Tylo telemetry, used by relaxed mode to
+# tell telemetry from random UDP noise.
+TELEMETRY_MARKERS = (
+    b"\xd2\x7d\x05\x08\x0a\x10",  # Tset
+    b"\xd2\x7d\x05\x08\x0c\x10",  # Tcur
+    b"\xd2\x7d\x04\x08\x11\x10",  # StopCfg alt
+    b"\xd2\x7d\x05\x08\x11\x10",  # StopCfg
+    b"\xd2\x7d\x04\x08\x16\x10",  # StopRem alt
+    b"\xd2\x7d\x05\x08\x16\x10",  # StopRem
+    b"\xda\x7d\x04\x08\x0a\x10",  # Light flag
+)
+# One alternation instead of one substring scan per marker
+_TELEMETRY_MARKER_RE = re.compile(b"|".join(re.escape(m) for m in TELEMETRY_MARKERS))
+
+
+def looks_like_telemetry(data: bytes) -> bool:
+    """
+    Heuristic check to avoid accepting random UDP noise when relaxed mode is enabled.
+    """
+    return _TELEMETRY_MARKER_RE.search(data) is not None
+
+
+UUID_RE = re.compile(
+    rb"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+)
+
+
+def extract_guid(data: bytes) -> str | None:
+    """Try to extract a GUID/UUID from payload as a hint."""
+    m = UUID_RE.search(data)
+    if not m:
+        return None
+    return m.group(0).decode("ascii")
+
+
+# === Commands ===
+
+# HELLO / INIT packets reverse engineered from the official app
+HELLO_PAYLOAD = bytes.fromhex(
+    "c23e33081412043030303028542879286c28f601282028722865286d286f28"
+    "74286528202863286f286e28742872286f286c3a025001"
+)
+INIT_SHORT = bytes.fromhex("8241020802")
+
+# Light commands
+LIGHT_OFF_PAYLOAD = bytes.fromhex("a24204080a1000")
+LIGHT_ON_PAYLOAD  = bytes.fromhex("a24204080a1001")
+
+# Heating commands
+HEAT_ON_PAYLOAD  = bytes.fromhex("c24302500b")
+HEAT_OFF_PAYLOAD = bytes.fromhex("c24302500a")
+HEAT_AUX_PAYLOAD = bytes.fromhex("d23e02081f")  # extra packet sent by the app for HEAT
+
+# Setpoint commands: prefix + varint value. The length byte is always 05, as
+# sent by the official app.
+SETTEMP_PREFIX = bytes.fromhex("d24105080a10")
+SETSTOP_PREFIX = bytes.fromhex("d24105080e10")
+SETSTOP_AUX_PAYLOAD = bytes.fromhex("d23e020801")
+
+
+def temperature_to_raw(temp_c: float) -> int:
+    return T_SET.to_raw(temp_c)
+
+
+def encode_set_temperature(raw: int) -> bytes:
+    """SETTEMP payload for a raw (°C * 9) setpoint."""
+    return SETTEMP_PREFIX + encode_varint(raw)
+
+
+def encode_set_stop_after(minutes: int) -> bytes:
+    """SETSTOP payload for the Stop after timer (minutes)."""
+    return SETSTOP_PREFIX + encode_varint(minutes)
+
+
+def decode_command(data: bytes) -> tuple[str, object] | None:
+    """
+    Identify a command sent to the controller.
+
+    Returns (state field, value it sets) for LIGHT, HEAT, SETTEMP and SETSTOP,
+    None for anything else (HELLO, INIT, keepalives, aux packets).
+    """
+    if data == LIGHT_ON_PAYLOAD:
+        return LIGHT.name, True
+    if data == LIGHT_OFF_PAYLOAD:
+        return LIGHT.name, False
+    if data == HEAT_ON_PAYLOAD:
+        return "heat", True
+    if data == HEAT_OFF_PAYLOAD:
+        return "heat", False
+    if data.startswith(SETTEMP_PREFIX):
+        raw, _ = decode_varint(data, len(SETTEMP_PREFIX))
+        return (T_SET.name, T_SET.to_state(raw)) if raw is not None else None
+    if data.startswith(SETSTOP_PREFIX):
+        minutes, _ = decode_varint(data, len(SETSTOP_PREFIX))
+        return (STOP_CFG.name, minutes) if minutes is not None else None
+    return None
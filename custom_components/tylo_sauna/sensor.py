@@ -1,4 +1,6 @@
 import logging
+from collections.abc import Callable
+from datetime import timedelta
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -7,13 +9,18 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 
 from . import DOMAIN
+from .controller import STATE_HEAT_RATE, STATE_HEATUP_ETA, STATE_STOP_REM
 
 _LOGGER = logging.getLogger(__name__)
 
+# Only the diagnostic sensors poll; the time-to-off sensor is pushed.
+SCAN_INTERVAL = timedelta(seconds=60)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
@@ -27,9 +34,17 @@ async def async_setup_entry(
         return
 
     controller = data["controller"]
-    entity = TyloSaunaTimeToOff(controller, entry.entry_id)
-    async_add_entities([entity])
-    _LOGGER.info("Tylo Sauna time-to-off sensor entity added")
+    entities: list[SensorEntity] = [
+        TyloSaunaTimeToOff(controller, entry.entry_id),
+        TyloSaunaHeatupEta(controller, entry.entry_id),
+        TyloSaunaHeatRate(controller, entry.entry_id),
+    ]
+    entities.extend(
+        TyloSaunaDiagnosticSensor(controller, entry.entry_id, *spec)
+        for spec in DIAGNOSTIC_SENSORS
+    )
+    async_add_entities(entities)
+    _LOGGER.info("Tylo Sauna time-to-off, heat-up and diagnostic sensor entities added")
 
 
 class TyloSaunaTimeToOff(SensorEntity):
@@ -38,18 +53,19 @@ class TyloSaunaTimeToOff(SensorEntity):
     _attr_device_class = SensorDeviceClass.DURATION
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_native_unit_of_measurement = "min"
+    _attr_should_poll = False
 
     def __init__(self, controller, entry_id: str) -> None:
         self._controller = controller
         self._entry_id = entry_id
         self._attr_name = f"{controller.name} time to off"
-        self._attr_unique_id = f"tylo_sauna_{controller.host}_time_to_off"
+        self._attr_unique_id = f"tylo_sauna_{controller.unique_host}_time_to_off"
 
     @property
     def device_info(self) -> DeviceInfo:
         """Device information shared between climate, light, number and sensor entities."""
         return DeviceInfo(
-            identifiers={(DOMAIN, self._controller.host)},
+            identifiers={(DOMAIN, self._controller.unique_host)},
             name=self._controller.name,
             manufacturer="Tylo",
             model="Elite",
@@ -57,7 +73,13 @@ class TyloSaunaTimeToOff(SensorEntity):
 
     async def async_added_to_hass(self) -> None:
         """Register for state updates from the controller."""
-        self._controller.register_callback(self.async_write_ha_state)
+        self.async_on_remove(
+            self._controller.register_callback(self._handle_controller_update, (STATE_STOP_REM,))
+        )
+
+    @callback
+    def _handle_controller_update(self, changed: set[str]) -> None:
+        self.async_write_ha_state()
 
     @property
     def native_value(self) -> int | None:
@@ -69,3 +91,209 @@ class TyloSaunaTimeToOff(SensorEntity):
         if self._controller.stop_rem_min is None:
             return None
         return int(self._controller.stop_rem_min)
+
+
+class TyloSaunaHeatupEta(SensorEntity):
+    """Sensor for the estimated time until the target temperature is reached."""
+
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "min"
+    _attr_should_poll = False
+
+    def __init__(self, controller, entry_id: str) -> None:
+        self._controller = controller
+        self._entry_id = entry_id
+        self._attr_name = f"{controller.name} time to ready"
+        self._attr_unique_id = f"tylo_sauna_{controller.unique_host}_heatup_eta"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Device information shared between climate, light, number and sensor entities."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._controller.unique_host)},
+            name=self._controller.name,
+            manufacturer="Tylo",
+            model="Elite",
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Register for state updates from the controller."""
+        self.async_on_remove(
+            self._controller.register_callback(self._handle_controller_update, (STATE_HEATUP_ETA,))
+        )
+
+    @callback
+    def _handle_controller_update(self, changed: set[str]) -> None:
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> int | None:
+        """
+        Minutes until the current temperature reaches the target, 0 once reached.
+
+        Unknown while heating is off or the temperature is not rising yet.
+        """
+        return self._controller.heatup_eta_min
+
+
+class TyloSaunaHeatRate(SensorEntity):
+    """Sensor for the current rate of temperature change."""
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = "°C/min"
+    _attr_should_poll = False
+
+    def __init__(self, controller, entry_id: str) -> None:
+        self._controller = controller
+        self._entry_id = entry_id
+        self._attr_name = f"{controller.name} heating rate"
+        self._attr_unique_id = f"tylo_sauna_{controller.unique_host}_heat_rate"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Device information shared between climate, light, number and sensor entities."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._controller.unique_host)},
+            name=self._controller.name,
+            manufacturer="Tylo",
+            model="Elite",
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Register for state updates from the controller."""
+        self.async_on_remove(
+            self._controller.register_callback(self._handle_controller_update, (STATE_HEAT_RATE,))
+        )
+
+    @callback
+    def _handle_controller_update(self, changed: set[str]) -> None:
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> float | None:
+        """
+        Fitted rate of rise in °C per minute (negative while cooling down).
+
+        Samples are weighted with a half-life of a few minutes and the fit
+        restarts whenever heating is switched on or off.
+        """
+        return self._controller.heat_rate_c_min
+
+
+def _packets_ignored(controller) -> int:
+    m = controller.metrics
+    return m.filtered + m.dropped
+
+
+def _transport_counters(controller) -> dict[str, int]:
+    """Senders the shared socket routed to no sauna, across all entries."""
+    transport = controller.transport
+    if transport is None:
+        return {}
+    return {
+        "socket_unrouted": transport.unrouted,
+        "socket_guid_mismatch": transport.guid_mismatch,
+    }
+
+
+# (key, name suffix, unit, value, attributes)
+DIAGNOSTIC_SENSORS: tuple[tuple[str, str, str | None, Callable, Callable], ...] = (
+    (
+        "parse_time",
+        "parse time",
+        "µs",
+        lambda c: c.metrics.parse_time_us.mean,
+        lambda c: c.metrics.parse_time_us.as_dict(),
+    ),
+    (
+        "state_write_delay",
+        "state write delay",
+        "ms",
+        lambda c: c.metrics.write_delay_ms.mean,
+        lambda c: c.metrics.write_delay_ms.as_dict(),
+    ),
+    (
+        "command_rtt",
+        "command round trip",
+        "ms",
+        lambda c: max(
+            (h.percentile(95) for h in c.metrics.command_rtt_ms.values() if h.count),
+            default=None,
+        ),
+        lambda c: {k: h.as_dict() for k, h in c.metrics.command_rtt_ms.items()},
+    ),
+    (
+        "packets_ignored",
+        "packets ignored",
+        None,
+        _packets_ignored,
+        lambda c: {
+            "filtered": c.metrics.filtered,
+            "guid_mismatch": c.metrics.guid_mismatch,
+            "dropped": c.metrics.dropped,
+            **_transport_counters(c),
+        },
+    ),
+    (
+        "packets_duplicate",
+        "duplicate packets",
+        None,
+        lambda c: c.rx_deduplicated,
+        lambda c: {"rx_packets": c.rx_packets, "rx_parsed": c.rx_parsed},
+    ),
+)
+
+
+class TyloSaunaDiagnosticSensor(SensorEntity):
+    """
+    Hot-path metric of the controller (histogram summary or packet counter).
+
+    Polled once per SCAN_INTERVAL and disabled by default, so the metrics do
+    not add state writes of their own unless someone asks for them.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        controller,
+        entry_id: str,
+        key: str,
+        name: str,
+        unit: str | None,
+        value_fn: Callable,
+        attrs_fn: Callable,
+    ) -> None:
+        self._controller = controller
+        self._entry_id = entry_id
+        self._value_fn = value_fn
+        self._attrs_fn = attrs_fn
+        self._attr_name = f"{controller.name} {name}"
+        self._attr_unique_id = f"tylo_sauna_{controller.unique_host}_{key}"
+        self._attr_native_unit_of_measurement = unit
+        if unit is None:
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Device information shared between climate, light, number and sensor entities."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, self._controller.unique_host)},
+            name=self._controller.name,
+            manufacturer="Tylo",
+            model="Elite",
+        )
+
+    @property
+    def native_value(self) -> float | int | None:
+        value = self._value_fn(self._controller)
+        if isinstance(value, float):
+            return round(value, 2)
+        return value
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        return self._attrs_fn(self._controller)
@@ -0,0 +1,286 @@
+"""
+Session statistics over captured telemetry (needs NumPy).
+
+Captures are turned into columnar arrays (one row per telemetry datagram:
+timestamp, sender, Tset, Tcur, StopCfg, StopRem, light, heat) with the
+integration's record decoder. Every distinct payload is decoded once, so
+months of mostly repeated frames cost one dict lookup per datagram; session
+segmentation and statistics are vectorized over the columns.
+
+A session is a run of heat = on (StopRem > 0) from one sauna, split at gaps
+of more than --max-gap seconds without telemetry. Per session:
+  - heat-up: time until Tcur first reaches Tset - --ready-margin, and the
+    average rate of rise until then
+  - time at temperature: time with |Tcur - Tset| <= --band
+  - overshoot: highest Tcur - Tset
+  - end: "timer" (StopRem ran out), "off" (switched off early) or "open"
+    (capture ended or gap in the capture)
+
+Usage:
+    python tools/analyze.py capture_192.168.1.50.bin* [--csv sessions.csv]
+    python tools/analyze.py capture.pcapng datagrams.log --json
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+from common import TELEMETRY_PORT, load_module, read_capture
+
+try:
+    import numpy as np
+except ImportError:
+    sys.exit("tools/analyze.py needs NumPy: pip install numpy")
+
+protocol = load_module("protocol")
+capture = load_module("capture")
+
+# Decoded payload table columns
+_T_SET, _T_CUR, _STOP_CFG, _STOP_REM, _LIGHT = range(5)
+_TABLE_KEYS = (
+    protocol.FIELD_T_SET,
+    protocol.FIELD_T_CUR,
+    protocol.FIELD_STOP_CFG,
+    protocol.FIELD_STOP_REM,
+    protocol.FIELD_LIGHT,
+)
+
+SESSION_FIELDS = (
+    "host", "start", "duration_min", "t_set_c", "t_start_c", "t_max_c",
+    "heatup_min", "heatup_rate_c_min", "at_temp_min", "overshoot_c",
+    "stop_cfg_min", "end",
+)
+
+
+def _datagrams(path: Path, port: int):
+    """(ts, src_ip, payload) of the telemetry datagrams of one file."""
+    if capture.is_capture(path):
+        for ts, src_ip, src_port, payload in capture.iter_capture(path):
+            if src_port == port:
+                yield ts, src_ip, payload
+    else:
+        for d in read_capture(path):
+            if d.src_port == port:
+                yield d.ts, d.src_ip, d.payload
+
+
+def load_columns(paths: list[Path], port: int = TELEMETRY_PORT) -> dict[str, "np.ndarray"]:
+    """
+    Columnar telemetry of all files, sorted by sender and time.
+
+    Missing fields are carried forward from the previous datagram of the same
+    sender (NaN until a sender reported the field once).
+    """
+    ts_col: list[float] = []
+    host_col: list[int] = []
+    payload_col: list[int] = []
+    hosts: dict[str, int] = {}
+    payload_ids: dict[bytes, int] = {}
+    table: list[tuple] = []
+
+    for path in paths:
+        for ts, src_ip, payload in _datagrams(path, port):
+            pid = payload_ids.get(payload)
+            if pid is None:
+                fields = protocol.decode_records(payload)
+                pid = payload_ids[payload] = len(table)
+                table.append(tuple(fields.get(k, np.nan) for k in _TABLE_KEYS))
+            ts_col.append(ts)
+            host_col.append(hosts.setdefault(src_ip, len(hosts)))
+            payload_col.append(pid)
+
+    ts = np.array(ts_col, dtype=np.float64)
+    host = np.array(host_col, dtype=np.int32)
+    decoded = np.array(table, dtype=np.float64).reshape(-1, len(_TABLE_KEYS))
+    rows = decoded[np.array(payload_col, dtype=np.int64)]
+
+    order = np.lexsort((ts, host))
+    ts, host, rows = ts[order], host[order], rows[order]
+    host_start = np.r_[True, host[1:] != host[:-1]] if len(host) else np.zeros(0, bool)
+    rows = _forward_fill(rows, host_start)
+
+    t_set = rows[:, _T_SET] / protocol.T_SET.scale
+    t_cur = rows[:, _T_CUR] / protocol.T_CUR.scale
+    stop_rem = rows[:, _STOP_REM]
+    light = rows[:, _LIGHT]
+    return {
+        "ts": ts,
+        "host": host,
+        "host_names": np.array(list(hosts), dtype=object),
+        "t_set_c": t_set,
+        "t_cur_c": t_cur,
+        "stop_cfg_min": rows[:, _STOP_CFG],
+        "stop_rem_min": stop_rem,
+        "light": np.where(np.isnan(light), -1, light).astype(np.int8),
+        "heat": np.nan_to_num(stop_rem, nan=0.0) > 0,
+        "payloads": np.int64(len(table)),
+    }
+
+
+def _forward_fill(values: "np.ndarray", group_start: "np.ndarray") -> "np.ndarray":
+    """Carry the last non-NaN value of each column forward within each group."""
+    n = len(values)
+    if not n:
+        return values
+    idx = np.arange(n)[:, None]
+    # A group start always "has" its own value, so nothing leaks across groups
+    source = np.where(~np.isnan(values) | group_start[:, None], idx, 0)
+    np.maximum.accumulate(source, axis=0, out=source)
+    return np.take_along_axis(values, source, axis=0)
+
+
+def sessions(
+    cols: dict[str, "np.ndarray"],
+    max_gap: float = 600.0,
+    ready_margin: float = 1.0,
+    band: float = 2.0,
+) -> dict[str, "np.ndarray"]:
+    """Segment heat-on runs and compute per-session statistics."""
+    ts, host, heat = cols["ts"], cols["host"], cols["heat"]
+    n = len(ts)
+    if not n:
+        return {name: np.zeros(0) for name in SESSION_FIELDS}
+
+    boundary = np.r_[True, (host[1:] != host[:-1]) | (np.diff(ts) > max_gap)]
+    starts_full = heat & (boundary | ~np.r_[False, heat[:-1]])
+
+    rows = np.flatnonzero(heat)
+    if not len(rows):
+        return {name: np.zeros(0) for name in SESSION_FIELDS}
+    sid = np.cumsum(starts_full)[rows]
+    first = np.flatnonzero(np.r_[True, sid[1:] != sid[:-1]])  # offsets into rows
+    last = np.r_[first[1:], len(rows)] - 1
+
+    s_ts = ts[rows]
+    t_cur = cols["t_cur_c"][rows]
+    t_set = cols["t_set_c"][rows]
+
+    # Time each sample stands for: until the next sample of the same session,
+    # at most max_gap
+    dt = np.r_[np.diff(s_ts), 0.0]
+    dt[last] = 0.0
+    np.minimum(dt, max_gap, out=dt)
+
+    t0 = s_ts[first]
+    t1 = s_ts[last]
+    with np.errstate(invalid="ignore"):
+        reached = t_cur >= t_set - ready_margin
+        at_temp = np.abs(t_cur - t_set) <= band
+    first_ready = np.minimum.reduceat(np.where(reached, s_ts, np.inf), first)
+    heatup_s = np.where(np.isfinite(first_ready), first_ready - t0, np.nan)
+    t_start = t_cur[first]
+    t_target = t_set[last]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rate = np.where(heatup_s > 0, (t_target - ready_margin - t_start) / (heatup_s / 60.0), np.nan)
+    overshoot = np.fmax.reduceat(np.where(reached, t_cur - t_set, np.nan), first)
+
+    # How the session ended: the datagram after its last row
+    last_full = rows[last]
+    nxt = last_full + 1
+    closed = nxt < n
+    closed[closed] &= ~boundary[nxt[closed]]
+    stop_rem_last = cols["stop_rem_min"][last_full]
+    end = np.where(~closed, "open", np.where(stop_rem_last <= 1, "timer", "off"))
+
+    return {
+        "host": cols["host_names"][host[last_full]],
+        "start": t0,
+        "duration_min": (t1 - t0) / 60.0,
+        "t_set_c": t_target,
+        "t_start_c": t_start,
+        "t_max_c": np.fmax.reduceat(t_cur, first),
+        "heatup_min": heatup_s / 60.0,
+        "heatup_rate_c_min": rate,
+        "at_temp_min": np.add.reduceat(dt * at_temp, first) / 60.0,
+        "overshoot_c": np.clip(overshoot, 0.0, None),
+        "stop_cfg_min": cols["stop_cfg_min"][rows[first]],
+        "end": end,
+    }
+
+
+def summary(stats: dict[str, "np.ndarray"]) -> dict[str, float | int]:
+    count = len(stats["start"])
+
+    def _median(name: str) -> float | None:
+        values = stats[name][~np.isnan(stats[name].astype(np.float64))] if count else []
+        return round(float(np.median(values)), 2) if len(values) else None
+
+    return {
+        "sessions": count,
+        "median_duration_min": _median("duration_min"),
+        "median_heatup_min": _median("heatup_min"),
+        "median_heatup_rate_c_min": _median("heatup_rate_c_min"),
+        "median_at_temp_min": _median("at_temp_min"),
+        "median_overshoot_c": _median("overshoot_c"),
+        "ended_by_timer": int(np.count_nonzero(stats["end"] == "timer")) if count else 0,
+        "ended_early": int(np.count_nonzero(stats["end"] == "off")) if count else 0,
+    }
+
+
+def _rows(stats: dict[str, "np.ndarray"]):
+    for i in range(len(stats["start"])):
+        row = {}
+        for name in SESSION_FIELDS:
+            value = stats[name][i]
+            if name == "start":
+                value = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(value))
+            elif isinstance(value, (float, np.floating)):
+                value = None if np.isnan(value) else round(float(value), 2)
+            else:
+                value = str(value)
+            row[name] = value
+        yield row
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "captures", type=Path, nargs="+",
+        help="integration captures, pcap/pcapng files or datagram logs",
+    )
+    parser.add_argument("--port", type=int, default=TELEMETRY_PORT, help="control port")
+    parser.add_argument("--max-gap", type=float, default=600.0,
+                        help="seconds without telemetry that split a session")
+    parser.add_argument("--ready-margin", type=float, default=1.0,
+                        help="°C below Tset that count as heated up")
+    parser.add_argument("--band", type=float, default=2.0,
+                        help="±°C around Tset that count as at temperature")
+    parser.add_argument("--csv", type=Path, help="write one row per session to this file")
+    parser.add_argument("--json", action="store_true", help="print sessions and summary as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    cols = load_columns(args.captures, args.port)
+    loaded = time.perf_counter()
+    stats = sessions(cols, args.max_gap, args.ready_margin, args.band)
+    done = time.perf_counter()
+    rows = list(_rows(stats))
+
+    if args.csv:
+        with args.csv.open("w", newline="", encoding="utf-8") as fh:
+            writer = csv.DictWriter(fh, fieldnames=SESSION_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    if args.json:
+        print(json.dumps({"summary": summary(stats), "sessions": rows}, indent=2))
+        return
+
+    for row in rows:
+        print(
+            f"{row['start']} {row['host']:<15} {row['duration_min'] or 0:6.1f} min  "
+            f"Tset={row['t_set_c']} start={row['t_start_c']} max={row['t_max_c']}  "
+            f"heat-up={row['heatup_min']} min ({row['heatup_rate_c_min']} °C/min)  "
+            f"at temp={row['at_temp_min']} min  overshoot={row['overshoot_c']}  end={row['end']}"
+        )
+    print(json.dumps(summary(stats)))
+    print(
+        f"datagrams={len(cols['ts'])} distinct={int(cols['payloads'])} "
+        f"load={loaded - started:.2f}s analyze={(done - loaded) * 1000:.1f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
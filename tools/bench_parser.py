@@ -0,0 +1,138 @@
+"""
+Benchmark the telemetry parsing and notification path.
+
+Runs recorded datagrams (or a synthetic heat-up session) through
+  - decode: the record decoder alone
+  - receive: SaunaController.datagram_received incl. dedup and notifications
+and reports datagrams per second, time per datagram and transient memory
+allocated per datagram (tracemalloc peak).
+
+Usage:
+    python tools/bench_parser.py [capture.pcapng | datagrams.log] [--repeat 20]
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+from pathlib import Path
+
+from common import TELEMETRY_PORT, Datagram, load_module, read_capture, telemetry_only
+
+controller_mod = load_module("controller")
+protocol = load_module("protocol")
+
+SYNTHETIC_HOST = "192.0.2.10"
+
+
+def synthetic_session(n: int = 3600) -> list[Datagram]:
+    """One datagram per second of a heat-up from 20 to 80 °C; mostly repeated frames."""
+    out = []
+    for i in range(n):
+        payload = protocol.encode_telemetry(
+            {
+                "t_set_c": 80.0,
+                "t_cur_c": min(20 * 9 + i // 6, 80 * 9) / 9.0,  # one raw step per 6 s
+                "stop_cfg_min": 60,
+                "stop_rem_min": max(60 - i // 60, 0),
+                "light": True,
+            }
+        )
+        out.append(Datagram(float(i), SYNTHETIC_HOST, TELEMETRY_PORT, 0, payload))
+    return out
+
+
+def _new_controller(host: str):
+    controller = controller_mod.SaunaController(
+        hass=None, host=host, port=TELEMETRY_PORT, name="bench"
+    )
+    controller.register_callback(lambda changed: None)
+    return controller
+
+
+def bench_decode(payloads: list[bytes], repeat: int) -> float:
+    decode = protocol.decode_records
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for p in payloads:
+            decode(p)
+    return time.perf_counter() - start
+
+
+def bench_receive(datagrams: list[Datagram], host: str, repeat: int) -> float:
+    elapsed = 0.0
+    for _ in range(repeat):
+        controller = _new_controller(host)
+        receive = controller.datagram_received
+        items = [(d.payload, (d.src_ip, d.src_port)) for d in datagrams]
+        start = time.perf_counter()
+        for payload, addr in items:
+            receive(payload, addr)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def alloc_per_datagram(datagrams: list[Datagram], host: str) -> tuple[float, float]:
+    """Average tracemalloc peak (bytes) per datagram for decode and receive."""
+    decode = protocol.decode_records
+    controller = _new_controller(host)
+    items = [(d.payload, (d.src_ip, d.src_port)) for d in datagrams]
+
+    tracemalloc.start()
+    try:
+        decode_total = receive_total = 0
+        for payload, addr in items:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            decode(payload)
+            decode_total += tracemalloc.get_traced_memory()[1] - base
+
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            controller.datagram_received(payload, addr)
+            receive_total += tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    n = max(len(items), 1)
+    return decode_total / n, receive_total / n
+
+
+def _report(name: str, count: int, elapsed: float, alloc: float) -> None:
+    per = elapsed / count if count else 0.0
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"{name:8s} {rate:14,.0f} dgram/s {per * 1e6:10.2f} us/dgram {alloc:10.1f} B/dgram")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("capture", type=Path, nargs="?", help="pcap, pcapng, integration capture or datagram log")
+    parser.add_argument("--port", type=int, default=TELEMETRY_PORT, help="control port")
+    parser.add_argument("--host", help="configured sauna IP (default: first sender)")
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the data")
+    args = parser.parse_args()
+
+    if args.capture:
+        datagrams = telemetry_only(read_capture(args.capture), args.port)
+    else:
+        datagrams = synthetic_session()
+    if not datagrams:
+        parser.error("no telemetry datagrams found")
+    host = args.host or datagrams[0].src_ip
+
+    async def _run() -> None:
+        count = len(datagrams) * args.repeat
+        decode_alloc, receive_alloc = alloc_per_datagram(datagrams, host)
+        print(f"{len(datagrams)} datagrams x {args.repeat} passes")
+        _report("decode", count, bench_decode([d.payload for d in datagrams], args.repeat), decode_alloc)
+        _report("receive", count, bench_receive(datagrams, host, args.repeat), receive_alloc)
+
+        controller = _new_controller(host)
+        for d in datagrams:
+            controller.datagram_received(d.payload, (d.src_ip, d.src_port))
+        print(f"parsed={controller.rx_parsed} deduplicated={controller.rx_deduplicated}")
+
+    # datagram_received reads the running loop's clock
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
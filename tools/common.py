@@ -0,0 +1,226 @@
+"""
+Shared helpers for the offline tools (replay, benchmarks, simulator).
+
+The tools run without Home Assistant: the integration package's __init__.py
+imports homeassistant, so the integration modules are loaded from their
+directory under a bare package name instead.
+"""
+import importlib
+import ipaddress
+import struct
+import sys
+import types
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+INTEGRATION_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "tylo_sauna"
+_PACKAGE = "tylo_sauna"
+
+TELEMETRY_PORT = 42156
+
+
+def load_module(name: str) -> types.ModuleType:
+    """Import custom_components/tylo_sauna/<name>.py without Home Assistant."""
+    if _PACKAGE not in sys.modules:
+        package = types.ModuleType(_PACKAGE)
+        package.__path__ = [str(INTEGRATION_DIR)]  # type: ignore[attr-defined]
+        sys.modules[_PACKAGE] = package
+    return importlib.import_module(f"{_PACKAGE}.{name}")
+
+
+@dataclass
+class Datagram:
+    """One captured UDP payload."""
+
+    ts: float
+    src_ip: str
+    src_port: int
+    dst_port: int
+    payload: bytes
+
+
+# === Datagram log ===
+#
+# One datagram per line: "<timestamp> <src_ip>[:<src_port>] <hex payload>".
+# Empty lines and lines starting with "#" are ignored.
+
+
+def read_datagram_log(path: Path) -> Iterator[Datagram]:
+    with path.open("r", encoding="ascii") as fh:
+        for lineno, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                ts, src, payload = line.split()
+                ip, _, port = src.partition(":")
+                src_port = int(port) if port else TELEMETRY_PORT
+                yield Datagram(float(ts), ip, src_port, 0, bytes.fromhex(payload))
+            except ValueError as exc:
+                raise ValueError(f"{path}:{lineno}: malformed line: {exc}") from exc
+
+
+def write_datagram_log(path: Path, datagrams) -> None:
+    with path.open("w", encoding="ascii") as fh:
+        for d in datagrams:
+            fh.write(f"{d.ts:.6f} {d.src_ip}:{d.src_port} {d.payload.hex()}\n")
+
+
+# === pcap / pcapng ===
+
+_LINKTYPE_NULL = 0
+_LINKTYPE_ETHERNET = 1
+_LINKTYPE_RAW = 101
+_LINKTYPE_LINUX_SLL = 113
+_LINKTYPE_LINUX_SLL2 = 276
+
+_PCAP_MAGIC = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1e-6),
+    b"\xa1\xb2\xc3\xd4": (">", 1e-6),
+    b"\x4d\x3c\xb2\xa1": ("<", 1e-9),
+    b"\xa1\xb2\x3c\x4d": (">", 1e-9),
+}
+_PCAPNG_SHB = b"\x0a\x0d\x0d\x0a"
+
+
+def read_pcap(path: Path) -> Iterator[Datagram]:
+    """Yield the UDP/IPv4 datagrams of a pcap or pcapng file."""
+    data = path.read_bytes()
+    magic = data[:4]
+    if magic in _PCAP_MAGIC:
+        yield from _read_pcap_classic(data)
+    elif magic == _PCAPNG_SHB:
+        yield from _read_pcapng(data)
+    else:
+        raise ValueError(f"{path}: not a pcap/pcapng file")
+
+
+def _read_pcap_classic(data: bytes) -> Iterator[Datagram]:
+    endian, ts_unit = _PCAP_MAGIC[data[:4]]
+    linktype = struct.unpack_from(endian + "I", data, 20)[0] & 0x0FFFFFFF
+    rec = struct.Struct(endian + "IIII")
+    pos = 24
+    while pos + rec.size <= len(data):
+        ts_sec, ts_frac, incl_len, _orig_len = rec.unpack_from(data, pos)
+        pos += rec.size
+        frame = data[pos:pos + incl_len]
+        pos += incl_len
+        d = _decode_frame(linktype, frame, ts_sec + ts_frac * ts_unit)
+        if d is not None:
+            yield d
+
+
+def _read_pcapng(data: bytes) -> Iterator[Datagram]:
+    endian = "<"
+    interfaces: list[tuple[int, float]] = []  # (linktype, ts unit)
+    pos = 0
+    while pos + 12 <= len(data):
+        block_type = struct.unpack_from(endian + "I", data, pos)[0]
+        if data[pos:pos + 4] == _PCAPNG_SHB:
+            bom = data[pos + 8:pos + 12]
+            endian = "<" if bom == b"\x4d\x3c\x2b\x1a" else ">"
+            interfaces = []
+        block_len = struct.unpack_from(endian + "I", data, pos + 4)[0]
+        if block_len < 12:
+            break
+        body = data[pos + 8:pos + block_len - 4]
+        if block_type == 0x00000001:  # Interface Description Block
+            linktype = struct.unpack_from(endian + "H", body, 0)[0]
+            interfaces.append((linktype, _pcapng_ts_unit(body[8:], endian)))
+        elif block_type == 0x00000006:  # Enhanced Packet Block
+            if_id, ts_hi, ts_lo, cap_len, _orig = struct.unpack_from(endian + "IIIII", body, 0)
+            if if_id < len(interfaces):
+                linktype, unit = interfaces[if_id]
+                d = _decode_frame(linktype, body[20:20 + cap_len], ((ts_hi << 32) | ts_lo) * unit)
+                if d is not None:
+                    yield d
+        elif block_type == 0x00000003 and interfaces:  # Simple Packet Block
+            d = _decode_frame(interfaces[0][0], body[4:], 0.0)
+            if d is not None:
+                yield d
+        pos += block_len
+
+
+def _pcapng_ts_unit(options: bytes, endian: str) -> float:
+    """Timestamp resolution from the if_tsresol option (default microseconds)."""
+    pos = 0
+    while pos + 4 <= len(options):
+        code, length = struct.unpack_from(endian + "HH", options, pos)
+        if code == 0:
+            break
+        if code == 9 and length >= 1:
+            tsresol = options[pos + 4]
+            if tsresol & 0x80:
+                return 2.0 ** -(tsresol & 0x7F)
+            return 10.0 ** -tsresol
+        pos += 4 + ((length + 3) & ~3)
+    return 1e-6
+
+
+def _decode_frame(linktype: int, frame: bytes, ts: float) -> Datagram | None:
+    if linktype == _LINKTYPE_ETHERNET:
+        if len(frame) < 14:
+            return None
+        ethertype = struct.unpack_from("!H", frame, 12)[0]
+        offset = 14
+        while ethertype in (0x8100, 0x88A8) and len(frame) >= offset + 4:  # VLAN tags
+            ethertype = struct.unpack_from("!H", frame, offset + 2)[0]
+            offset += 4
+        if ethertype != 0x0800:
+            return None
+        return _decode_ipv4(frame[offset:], ts)
+    if linktype == _LINKTYPE_LINUX_SLL:
+        if len(frame) < 16 or struct.unpack_from("!H", frame, 14)[0] != 0x0800:
+            return None
+        return _decode_ipv4(frame[16:], ts)
+    if linktype == _LINKTYPE_LINUX_SLL2:
+        if len(frame) < 20 or struct.unpack_from("!H", frame, 0)[0] != 0x0800:
+            return None
+        return _decode_ipv4(frame[20:], ts)
+    if linktype == _LINKTYPE_RAW:
+        return _decode_ipv4(frame, ts)
+    if linktype == _LINKTYPE_NULL:
+        return _decode_ipv4(frame[4:], ts)
+    return None
+
+
+def _decode_ipv4(packet: bytes, ts: float) -> Datagram | None:
+    if len(packet) < 20 or packet[0] >> 4 != 4 or packet[9] != 17:  # IPv4 / UDP
+        return None
+    if struct.unpack_from("!H", packet, 6)[0] & 0x1FFF:  # non-first fragment
+        return None
+    ihl = (packet[0] & 0x0F) * 4
+    total_len = struct.unpack_from("!H", packet, 2)[0]
+    udp = packet[ihl:total_len or None]
+    if len(udp) < 8:
+        return None
+    src_port, dst_port, udp_len = struct.unpack_from("!HHH", udp, 0)
+    src_ip = str(ipaddress.IPv4Address(packet[12:16]))
+    return Datagram(ts, src_ip, src_port, dst_port, bytes(udp[8:udp_len]))
+
+
+# === Integration capture files (capture.py) ===
+
+
+def read_tylo_capture(path: Path) -> Iterator[Datagram]:
+    """Yield the datagrams of a capture written by the capture option."""
+    capture = load_module("capture")
+    for ts, src_ip, src_port, payload in capture.iter_capture(path):
+        yield Datagram(ts, src_ip, src_port, TELEMETRY_PORT, bytes(payload))
+
+
+def read_capture(path: Path) -> list[Datagram]:
+    """Read a pcap/pcapng capture, an integration capture or a datagram log, by content."""
+    with path.open("rb") as fh:
+        magic = fh.read(8)
+    if magic[:4] in _PCAP_MAGIC or magic[:4] == _PCAPNG_SHB:
+        return list(read_pcap(path))
+    if magic == load_module("capture").CAPTURE_MAGIC:
+        return list(read_tylo_capture(path))
+    return list(read_datagram_log(path))
+
+
+def telemetry_only(datagrams, port: int = TELEMETRY_PORT) -> list[Datagram]:
+    """Datagrams sent by a sauna controller (UDP source port = control port)."""
+    return [d for d in datagrams if d.src_port == port]
@@ -0,0 +1,156 @@
+"""
+Check that reloading config entries does not leak sockets, tasks or callbacks.
+
+Starts a minimal Home Assistant core (registries and config entries, no
+frontend or recorder) with the integration linked into a temporary config
+directory, adds config entries for simulated saunas (see simulator.py) and
+reloads them many times through Home Assistant itself: alternately with
+async_reload and by changing the entry options (update listener). Every
+cycle therefore runs async_setup_entry / async_unload_entry, the platforms,
+the state snapshot Store, the discovery callback and the shared socket
+bookkeeping in hass.data.
+
+Open file descriptors, asyncio tasks and discovery callbacks are counted
+after a warm-up cycle and again at the end; any growth fails the check.
+Runs with one entry (the shared socket is closed and reopened on every
+reload) and with two entries (the socket stays open).
+
+Needs Home Assistant: pip install homeassistant
+
+Usage:
+    python tools/reload_check.py [--cycles 50]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from common import TELEMETRY_PORT
+from simulator import start_sauna
+
+try:
+    from homeassistant import config_entries, loader
+    from homeassistant.bootstrap import async_load_base_functionality
+    from homeassistant.core import HomeAssistant
+except ImportError:
+    sys.exit("tools/reload_check.py needs Home Assistant: pip install homeassistant")
+
+DOMAIN = "tylo_sauna"
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "custom_components" / DOMAIN
+SAUNA_HOSTS = ("127.0.0.10", "127.0.0.11")
+SETTLE_TIMEOUT = 2.0  # seconds for a reloaded entry to receive telemetry
+
+
+def _open_fds() -> int:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except FileNotFoundError:  # not Linux
+        return -1
+
+
+def _resources(hass: HomeAssistant) -> tuple[int, int, int]:
+    listener = hass.data.get(DOMAIN, {}).get("discovery")
+    callbacks = len(listener._callbacks) if listener is not None else 0
+    return _open_fds(), len(asyncio.all_tasks()), callbacks
+
+
+async def _async_start_hass(config_dir: str) -> HomeAssistant:
+    """Core, registries and config entries; nothing else is set up."""
+    custom = Path(config_dir, "custom_components")
+    custom.mkdir()
+    (custom / DOMAIN).symlink_to(PACKAGE_DIR)
+
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await async_load_base_functionality(hass)
+    await hass.async_start()
+    return hass
+
+
+async def _async_wait_telemetry(hass: HomeAssistant, entry) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + SETTLE_TIMEOUT
+    while loop.time() < deadline:
+        data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if data is not None and data["controller"].rx_packets:
+            return
+        await asyncio.sleep(0.01)
+    raise RuntimeError(f"{entry.title}: no telemetry after reload")
+
+
+async def _async_reload(hass: HomeAssistant, entry, cycle: int) -> None:
+    """Reload one entry; odd cycles go through an options change."""
+    if cycle % 2:
+        hass.config_entries.async_update_entry(
+            entry, options={**entry.options, "flush_window_ms": cycle % 4 * 50}
+        )
+        await hass.async_block_till_done()
+    else:
+        assert await hass.config_entries.async_reload(entry.entry_id)
+    await _async_wait_telemetry(hass, entry)
+
+
+async def run(cycles: int) -> bool:
+    saunas = [await start_sauna(host) for host in SAUNA_HOSTS]
+    ok = True
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await _async_start_hass(config_dir)
+        entries = []
+        for count in (1, 2):
+            while len(entries) < count:
+                sauna = saunas[len(entries)]
+                entry = config_entries.ConfigEntry(
+                    version=1,
+                    minor_version=1,
+                    domain=DOMAIN,
+                    title=f"Sauna {sauna.host}",
+                    data={
+                        "host": sauna.host,
+                        "port": TELEMETRY_PORT,
+                        "name": f"Sauna {sauna.host}",
+                        "guid": sauna.guid,
+                    },
+                    source=config_entries.SOURCE_USER,
+                    unique_id=sauna.guid,
+                )
+                await hass.config_entries.async_add(entry)
+                await _async_wait_telemetry(hass, entry)
+                entries.append(entry)
+
+            for entry in entries:  # warm-up: lazy imports, platforms, registries
+                await _async_reload(hass, entry, 0)
+            await hass.async_block_till_done()
+            before = _resources(hass)
+            for cycle in range(cycles):
+                for entry in entries:
+                    await _async_reload(hass, entry, cycle)
+            await hass.async_block_till_done()
+            after = _resources(hass)
+
+            flat = all(b >= a for b, a in zip(before, after))
+            ok &= flat
+            print(
+                f"{count} entr{'y' if count == 1 else 'ies'}, {cycles} reloads each: "
+                f"fds {before[0]} -> {after[0]}, tasks {before[1]} -> {after[1]}, "
+                f"discovery callbacks {before[2]} -> {after[2]}  {'ok' if flat else 'LEAK'}"
+            )
+
+        await hass.async_stop()
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cycles", type=int, default=50, help="reloads per entry")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    sys.exit(0 if asyncio.run(run(args.cycles)) else 1)
+
+
+if __name__ == "__main__":
+    main()
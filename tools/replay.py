@@ -0,0 +1,85 @@
+"""
+Replay captured telemetry through SaunaController without a device or Home Assistant.
+
+Every UDP payload sent from the control port (42156) is pushed through the
+shared SaunaTransport (which learns the telemetry address in relaxed mode) to
+the controller, in capture order, and each resulting state change is printed.
+
+Usage:
+    python tools/replay.py capture.pcapng [--host 192.168.1.50] [--strict]
+    python tools/replay.py datagrams.log --quiet
+    python tools/replay.py config/tylo_sauna/capture_192.168.1.50.bin
+"""
+import argparse
+import asyncio
+from pathlib import Path
+
+from common import TELEMETRY_PORT, load_module, read_capture, telemetry_only
+
+controller_mod = load_module("controller")
+
+
+async def replay(datagrams, host: str | None, strict: bool, quiet: bool):
+    """Feed datagrams into a fresh controller; returns the controller."""
+    if host is None:
+        host = datagrams[0].src_ip if datagrams else "0.0.0.0"
+
+    transport = controller_mod.SaunaTransport()
+    controller = controller_mod.SaunaController(
+        hass=None,
+        host=host,
+        port=TELEMETRY_PORT,
+        name="replay",
+        relaxed_telemetry=not strict,
+        transport=transport,
+    )
+    # Opens an unused local socket; only the routing tables matter here
+    await transport.async_attach(controller)
+
+    current_ts = [0.0]
+
+    def _print_state(changed: set[str]) -> None:
+        if quiet:
+            return
+        print(
+            f"{current_ts[0]:.3f} {','.join(sorted(changed))}: "
+            f"light={controller.light} heat={controller.heat} "
+            f"t_set={_fmt(controller.t_set_c)} t_cur={_fmt(controller.t_cur_c)} "
+            f"stop_cfg={controller.stop_cfg_min} stop_rem={controller.stop_rem_min}"
+        )
+
+    controller.register_callback(_print_state)
+    try:
+        for d in datagrams:
+            current_ts[0] = d.ts
+            transport.datagram_received(d.payload, (d.src_ip, d.src_port))
+    finally:
+        transport.close()
+    return controller
+
+
+def _fmt(value: float | None) -> str:
+    return f"{value:.1f}" if value is not None else "?"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("capture", type=Path, help="pcap, pcapng, integration capture or datagram log")
+    parser.add_argument("--host", help="configured sauna IP (default: first sender)")
+    parser.add_argument("--port", type=int, default=TELEMETRY_PORT, help="control port")
+    parser.add_argument("--strict", action="store_true", help="disable relaxed telemetry mode")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args()
+
+    datagrams = telemetry_only(read_capture(args.capture), args.port)
+
+    controller = asyncio.run(replay(datagrams, args.host, args.strict, args.quiet))
+    print(
+        f"datagrams={len(datagrams)} accepted={controller.rx_packets} "
+        f"parsed={controller.rx_parsed} deduplicated={controller.rx_deduplicated} "
+        f"telemetry_host={controller.telemetry_host or controller.host}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""
+Local Tylo Elite stand-in speaking the reverse-engineered UDP protocol.
+
+A simulated sauna answers HELLO/INIT, emits d27d/da7d telemetry at a fixed
+rate to every client that said HELLO, broadcasts its GUID for discovery and
+applies LIGHT, HEAT, SETTEMP and SETSTOP commands to its state. Packet loss,
+duplication and reordering can be injected on everything it sends and
+receives.
+
+Usage:
+    # one sauna on 127.0.0.10:42156
+    python tools/simulator.py
+
+    # load test: 20 saunas on 127.0.0.10-29, one SaunaController each, sharing
+    # one socket; prints command-to-telemetry latency per command kind
+    python tools/simulator.py --load 20 --duration 60 --loss 0.05
+
+Each sauna listens on its own loopback address (127.0.0.x), which Linux
+routes without extra configuration.
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from dataclasses import dataclass
+
+from common import TELEMETRY_PORT, load_module
+
+controller_mod = load_module("controller")
+protocol = load_module("protocol")
+
+DISCOVERY_PORTS = protocol.DISCOVERY_PORTS
+DISCOVERY_PREFIX = b"TYLO"  # bytes before the GUID; discovery only looks for the GUID
+
+
+@dataclass
+class Impairments:
+    loss: float = 0.0       # probability a packet is dropped
+    duplicate: float = 0.0  # probability a packet is sent twice
+    reorder: float = 0.0    # probability a packet is held back behind the next one
+    reorder_delay: float = 0.05  # seconds a held-back packet waits at most
+
+
+class SimulatedSauna(asyncio.DatagramProtocol):
+    """One simulated controller."""
+
+    def __init__(
+        self,
+        guid: str | None = None,
+        rate: float = 1.0,
+        time_scale: float = 1.0,
+        impairments: Impairments | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.guid = guid or str(uuid.uuid4())
+        self.rate = rate
+        self.time_scale = time_scale  # simulated seconds per real second
+        self.impairments = impairments or Impairments()
+        self._random = random.Random(seed)
+
+        # Controller state in wire units
+        self.light = False
+        self.t_set_raw = 80 * 9
+        self.t_cur_raw = 20 * 9
+        self.stop_cfg = 60  # minutes
+        self.stop_rem = 0   # minutes, > 0 while heating
+        self._sim_seconds = 0.0
+        self._t_carry = 0.0  # raw temperature steps not applied yet
+
+        self.clients: set[tuple[str, int]] = set()
+        self.rx_commands = 0
+        self.tx_packets = 0
+        self._transport: asyncio.DatagramTransport | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    # === asyncio protocol ===
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport  # type: ignore[assignment]
+        self._tasks.append(asyncio.get_running_loop().create_task(self._telemetry_loop()))
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        # Commands cross the same lossy network as telemetry
+        self._impair(self._receive, data, addr)
+
+    def _receive(self, data: bytes, addr) -> None:
+        self.clients.add(addr)
+        if self._apply_command(data):
+            self.rx_commands += 1
+        # The controller answers HELLO/INIT and every command with a state frame.
+        self._emit(self.telemetry_frame(), addr)
+
+    # === Protocol ===
+
+    def _apply_command(self, data: bytes) -> bool:
+        command = protocol.decode_command(data)
+        if command is None:
+            return False  # HELLO, INIT, keepalive, aux packets
+        name, value = command
+        if name == "light":
+            self.light = value
+        elif name == "heat":
+            self.stop_rem = self.stop_cfg if value else 0
+        elif name == "t_set_c":
+            self.t_set_raw = protocol.temperature_to_raw(value)
+        elif name == "stop_cfg_min":
+            self.stop_cfg = value
+        return True
+
+    def telemetry_frame(self) -> bytes:
+        return b"".join(
+            (
+                protocol.encode_record(protocol.REC_VALUE, protocol.T_SET.field_id, self.t_set_raw),
+                protocol.encode_record(protocol.REC_VALUE, protocol.T_CUR.field_id, self.t_cur_raw),
+                protocol.encode_record(protocol.REC_VALUE, protocol.STOP_CFG.field_id, self.stop_cfg),
+                protocol.encode_record(protocol.REC_VALUE, protocol.STOP_REM.field_id, self.stop_rem),
+                protocol.encode_record(protocol.REC_FLAG, protocol.LIGHT.field_id, int(self.light)),
+            )
+        )
+
+    def discovery_payload(self) -> bytes:
+        return DISCOVERY_PREFIX + self.guid.encode("ascii")
+
+    # === Simulation ===
+
+    def step(self, seconds: float) -> None:
+        """Advance heating and the auto-off countdown by simulated seconds."""
+        self._sim_seconds += seconds
+        heating = self.stop_rem > 0
+        # ~1 °C per minute while heating, slow cool-down otherwise (raw = °C * 9)
+        target = self.t_set_raw if heating else 20 * 9
+        rate = 9 / 60 if heating else 3 / 60
+        # Fractional raw steps are carried over, so short ticks keep the rate
+        if self.t_cur_raw == target:
+            self._t_carry = 0.0
+        else:
+            self._t_carry += rate * seconds
+            steps = int(self._t_carry)
+            self._t_carry -= steps
+            if self.t_cur_raw < target:
+                self.t_cur_raw = min(target, self.t_cur_raw + steps)
+            else:
+                self.t_cur_raw = max(target, self.t_cur_raw - steps)
+        while heating and self._sim_seconds >= 60:
+            self._sim_seconds -= 60
+            self.stop_rem = max(self.stop_rem - 1, 0)
+            heating = self.stop_rem > 0
+
+    async def _telemetry_loop(self) -> None:
+        interval = 1.0 / self.rate
+        while True:
+            await asyncio.sleep(interval)
+            self.step(interval * self.time_scale)
+            frame = self.telemetry_frame()
+            for addr in list(self.clients):
+                self._emit(frame, addr)
+
+    async def broadcast_discovery(self, target: str, interval: float = 5.0) -> None:
+        """Send the GUID to the discovery ports until cancelled."""
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            asyncio.DatagramProtocol, local_addr=(self.host, 0), allow_broadcast=True
+        )
+        try:
+            while True:
+                for port in DISCOVERY_PORTS:
+                    transport.sendto(self.discovery_payload(), (target, port))
+                await asyncio.sleep(interval)
+        finally:
+            transport.close()
+
+    @property
+    def host(self) -> str:
+        return self._transport.get_extra_info("sockname")[0] if self._transport else "0.0.0.0"
+
+    # === Impairments ===
+
+    def _emit(self, payload: bytes, addr) -> None:
+        self._impair(self._sendto, payload, addr)
+
+    def _impair(self, deliver, payload: bytes, addr) -> None:
+        """Deliver payload through loss, duplication and reordering."""
+        imp = self.impairments
+        rnd = self._random.random
+        if imp.loss and rnd() < imp.loss:
+            return
+        copies = 2 if imp.duplicate and rnd() < imp.duplicate else 1
+        for _ in range(copies):
+            if imp.reorder and rnd() < imp.reorder:
+                delay = self._random.uniform(0, imp.reorder_delay)
+                asyncio.get_running_loop().call_later(delay, deliver, payload, addr)
+            else:
+                deliver(payload, addr)
+
+    def _sendto(self, payload: bytes, addr) -> None:
+        if self._transport is not None:
+            self._transport.sendto(payload, addr)
+            self.tx_packets += 1
+
+
+async def start_sauna(host: str, port: int = TELEMETRY_PORT, **kwargs) -> SimulatedSauna:
+    loop = asyncio.get_running_loop()
+    _transport, sauna = await loop.create_datagram_endpoint(
+        lambda: SimulatedSauna(**kwargs), local_addr=(host, port)
+    )
+    return sauna
+
+
+# === Load test ===
+
+
+class _LoopHass:
+    """The part of HomeAssistant that SaunaController uses, backed by the running loop."""
+
+    def __init__(self) -> None:
+        self.loop = asyncio.get_running_loop()
+
+    def async_create_task(self, coro):
+        return self.loop.create_task(coro)
+
+    def async_create_background_task(self, coro, name: str):
+        return self.loop.create_task(coro, name=name)
+
+    create_task = async_create_task
+
+
+async def run_load_test(args, impairments: Impairments) -> None:
+    saunas = [
+        await start_sauna(
+            f"127.0.0.{10 + i}",
+            rate=args.rate,
+            time_scale=args.time_scale,
+            impairments=impairments,
+            seed=args.seed + i if args.seed is not None else None,
+        )
+        for i in range(args.load)
+    ]
+
+    hass = _LoopHass()
+    transport = controller_mod.SaunaTransport()
+    controllers = [
+        controller_mod.SaunaController(
+            hass=hass,
+            host=sauna.host,
+            port=TELEMETRY_PORT,
+            name=f"sim-{i}",
+            guid=sauna.guid,
+            transport=transport,
+        )
+        for i, sauna in enumerate(saunas)
+    ]
+    for controller in controllers:
+        await controller.async_start()
+
+    # Drive commands at random while telemetry flows
+    rnd = random.Random(args.seed)
+    loop = asyncio.get_running_loop()
+    end = loop.time() + args.duration
+    while loop.time() < end:
+        await asyncio.sleep(args.command_interval)
+        controller = rnd.choice(controllers)
+        action = rnd.randrange(4)
+        if action == 0 and controller.light:
+            controller.light_off()
+        elif action == 0:
+            controller.light_on()
+        elif action == 1 and controller.heat:
+            controller.heat_off()
+        elif action == 1:
+            controller.heat_on()
+        elif action == 2:
+            await controller.async_set_temperature(rnd.randint(60, 100))
+        else:
+            await controller.async_set_stop_after(rnd.randint(10, 300))
+    await asyncio.sleep(1.0)  # let in-flight commands settle
+
+    print(f"{len(saunas)} saunas, {args.duration:.0f}s, loss={impairments.loss} "
+          f"dup={impairments.duplicate} reorder={impairments.reorder}")
+    totals: dict[str, controller_mod.CommandStats] = {}
+    for controller in controllers:
+        for kind, stats in controller.command_stats.items():
+            total = totals.setdefault(kind, controller_mod.CommandStats())
+            for name in ("sent", "confirmed", "retries", "failed", "collapsed", "replaced",
+                         "superseded", "total_latency"):
+                setattr(total, name, getattr(total, name) + getattr(stats, name))
+    for kind, stats in sorted(totals.items()):
+        print(f"  {kind:16s} {stats.as_dict()}")
+    print(f"  rx_packets={sum(c.rx_packets for c in controllers)} "
+          f"rx_parsed={sum(c.rx_parsed for c in controllers)} "
+          f"tx_packets={sum(c.tx_packets for c in controllers)}")
+    transport.close()
+
+
+async def run_saunas(args, impairments: Impairments) -> None:
+    saunas = [
+        await start_sauna(
+            f"127.0.0.{10 + i}",
+            port=args.port,
+            rate=args.rate,
+            time_scale=args.time_scale,
+            impairments=impairments,
+            seed=args.seed + i if args.seed is not None else None,
+        )
+        for i in range(args.count)
+    ]
+    tasks = [
+        asyncio.create_task(sauna.broadcast_discovery(args.discovery_target))
+        for sauna in saunas
+    ]
+    for sauna in saunas:
+        print(f"sauna {sauna.guid} on {sauna.host}:{args.port}")
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--count", type=int, default=1, help="saunas to run (127.0.0.10+)")
+    parser.add_argument("--port", type=int, default=TELEMETRY_PORT, help="control port")
+    parser.add_argument("--rate", type=float, default=1.0, help="telemetry frames per second")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="simulated s per real s")
+    parser.add_argument("--discovery-target", default="127.255.255.255",
+                        help="address discovery broadcasts are sent to")
+    parser.add_argument("--loss", type=float, default=0.0, help="packet loss probability")
+    parser.add_argument("--duplicate", type=float, default=0.0, help="duplication probability")
+    parser.add_argument("--reorder", type=float, default=0.0, help="reordering probability")
+    parser.add_argument("--seed", type=int, help="random seed")
+    parser.add_argument("--load", type=int, default=0,
+                        help="run a load test with this many saunas and controllers")
+    parser.add_argument("--duration", type=float, default=30.0, help="load test length (s)")
+    parser.add_argument("--command-interval", type=float, default=0.1,
+                        help="seconds between load test commands")
+    args = parser.parse_args()
+
+    impairments = Impairments(loss=args.loss, duplicate=args.duplicate, reorder=args.reorder)
+    try:
+        if args.load:
+            asyncio.run(run_load_test(args, impairments))
+        else:
+            asyncio.run(run_saunas(args, impairments))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()